@@ -1,82 +1,94 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import uuid
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO
+from contextlib import asynccontextmanager
+from uuid6 import uuid7
 import os
+import io
 import tempfile
 from datetime import datetime
 import asyncio
+import hashlib
+import orjson
 import sys
-import importlib.util
+import aiofiles
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the project root to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-# Import modules using importlib to handle path issues
-ocr_engine_spec = importlib.util.spec_from_file_location(
-    "OCREngine", 
-    os.path.join(project_root, "backend", "ocr_engine", "ocr_engine.py")
-)
-OCRModule = importlib.util.module_from_spec(ocr_engine_spec)
-ocr_engine_spec.loader.exec_module(OCRModule)
-OCREngine = OCRModule.OCREngine
+from backend.ocr_engine.ocr_engine import OCREngine
+from backend.preprocessing.preprocessor import DocumentPreprocessor
+from backend.ocr_engine.field_extractor import FieldExtractor
+from backend.verification.ai_verifier import AIVerifier, RuleBasedValidator
+from backend.storage.data_storage import DataStorageManager, StorageUnavailableError
+from backend.storage.status_store import ProcessingStatusStore
+from backend.storage.ocr_cache import OCRResultCache
+from backend.pipeline import run_pipeline
+from config.settings import Config
 
-preprocessor_spec = importlib.util.spec_from_file_location(
-    "DocumentPreprocessor", 
-    os.path.join(project_root, "backend", "preprocessing", "preprocessor.py")
-)
-preprocessor_module = importlib.util.module_from_spec(preprocessor_spec)
-preprocessor_spec.loader.exec_module(preprocessor_module)
-DocumentPreprocessor = preprocessor_module.DocumentPreprocessor
+# Thread pool for the blocking pipeline stages (OpenCV, Tesseract, HTTP calls to
+# OCR/AI providers, database drivers) so they never run on the event loop
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
 
-field_extractor_spec = importlib.util.spec_from_file_location(
-    "FieldExtractor", 
-    os.path.join(project_root, "backend", "ocr_engine", "field_extractor.py")
-)
-field_extractor_module = importlib.util.module_from_spec(field_extractor_spec)
-field_extractor_spec.loader.exec_module(field_extractor_module)
-FieldExtractor = field_extractor_module.FieldExtractor
+async def run_blocking(fn, *args):
+    """
+    Run a blocking callable in the thread pool and await its result
+    """
+    return await asyncio.get_event_loop().run_in_executor(executor, fn, *args)
 
-ai_verifier_spec = importlib.util.spec_from_file_location(
-    "AIVerifier", 
-    os.path.join(project_root, "backend", "verification", "ai_verifier.py")
-)
-ai_verifier_module = importlib.util.module_from_spec(ai_verifier_spec)
-ai_verifier_spec.loader.exec_module(ai_verifier_module)
-AIVerifier = ai_verifier_module.AIVerifier
-RuleBasedValidator = ai_verifier_module.RuleBasedValidator
-
-data_storage_spec = importlib.util.spec_from_file_location(
-    "DataStorageManager", 
-    os.path.join(project_root, "backend", "storage", "data_storage.py")
-)
-data_storage_module = importlib.util.module_from_spec(data_storage_spec)
-data_storage_spec.loader.exec_module(data_storage_module)
-DataStorageManager = data_storage_module.DataStorageManager
+def _warm_up(state):
+    """
+    Run a synthetic page through preprocessing and Tesseract, so the first request
+    does not pay the one-time costs: compiling or loading the Numba kernels,
+    OpenCV's first calls and Tesseract reading its language data from disk
+    """
+    page = np.full((400, 600), 255, dtype=np.uint8)
+    for row in range(60, 400, 60):
+        cv2.putText(page, "WARM UP 1234", (30, row), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    _, encoded = cv2.imencode('.png', page)
+    
+    state.preprocessor.is_clean_document(page)
+    processed_img = state.preprocessor.preprocess_document_array(io.BytesIO(encoded.tobytes()), skip_if_clean=False)
+    state.ocr_engine.tesseract_ocr_from_array(processed_img)
 
-config_spec = importlib.util.spec_from_file_location(
-    "Config", 
-    os.path.join(project_root, "config", "settings.py")
-)
-config_module = importlib.util.module_from_spec(config_spec)
-config_spec.loader.exec_module(config_module)
-Config = config_module.Config
-
-# Initialize the OCR system components
-ocr_engine = OCREngine()
-preprocessor = DocumentPreprocessor()
-field_extractor = FieldExtractor()
-ai_verifier = AIVerifier()
-rule_validator = RuleBasedValidator()
-storage_manager = DataStorageManager()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize the OCR system components once per worker, after the event loop is up
+    """
+    app.state.ocr_engine = OCREngine()
+    app.state.preprocessor = DocumentPreprocessor()
+    app.state.field_extractor = FieldExtractor()
+    app.state.ai_verifier = AIVerifier()
+    app.state.rule_validator = RuleBasedValidator()
+    # Connecting to MongoDB is blocking I/O; PostgreSQL connects on first use
+    app.state.storage_manager = await run_blocking(DataStorageManager)
+    app.state.status_store = ProcessingStatusStore()
+    app.state.ocr_cache = OCRResultCache()
+    
+    if Config.WARM_UP_ON_STARTUP:
+        try:
+            await run_blocking(_warm_up, app.state)
+        except Exception as e:
+            print(f"Warning: OCR warm-up failed: {e}")
+    
+    yield
+    
+    await app.state.status_store.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Smart OCR & Verification Engine API",
     description="A modular OCR + AI verification system with confidence scoring",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -88,6 +100,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves server-sent event streams uncompressed, since the
+    gzip buffer would otherwise hold progress events back from the client
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/ocr/events/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress larger responses such as documents carrying their full OCR text
+app.add_middleware(EventStreamAwareGZipMiddleware, minimum_size=1000)
+
+@app.exception_handler(StorageUnavailableError)
+async def storage_unavailable_handler(request: Request, exc: StorageUnavailableError):
+    """
+    Report a database outage as 503 so clients know to retry later
+    """
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 # Pydantic models
 class OCRProcessRequest(BaseModel):
     file_url: Optional[str] = None
@@ -111,158 +145,239 @@ class ValidationResult(BaseModel):
     issues_detected: list
     status: str
 
-# In-memory storage for processing status (in production, use Redis or database)
-processing_status = {}
+def _build_ocr_response(document_id: str, doc: Dict[str, Any]) -> OCRResponse:
+    """
+    Build an OCRResponse from a stored document
+    """
+    # Handle both cases where doc is from PG or combined
+    if 'full_data' in doc:
+        # This is a combined result
+        extracted_fields = doc['full_data'].get('extracted_fields', {})
+        confidence_score = doc['full_data'].get('confidence', 0.0)
+    else:
+        # This is a PG-only result
+        extracted_fields = doc.get('extracted_fields', {})
+        confidence_score = float(doc.get('confidence', 0.0)) if doc.get('confidence') is not None else 0.0
+    
+    return OCRResponse(
+        id=document_id,
+        status=doc.get('status', 'unknown'),
+        extracted_fields=extracted_fields,
+        confidence_score=confidence_score,
+        processing_time=doc.get('processing_metadata', {}).get('processing_time', 0.0)
+    )
 
-@app.get("/")
-async def root():
-    return {"message": "Smart OCR & Verification Engine API", "status": "running"}
+async def _spool_upload(file: UploadFile) -> Tuple[BinaryIO, str]:
+    """
+    Read an upload in chunks and hash its content. Files up to SMALL_FILE_LIMIT stay
+    in memory; larger ones are spilled to an unnamed temporary file (O_TMPFILE on
+    Linux) with a large write buffer. Returns the file object, rewound, and the
+    content hash.
+    """
+    content_hasher = hashlib.blake2b(digest_size=32)
+    buffer = io.BytesIO()
+    temp_file = None
+    temp_writer = None
+    
+    try:
+        while chunk := await file.read(Config.UPLOAD_CHUNK_SIZE):
+            content_hasher.update(chunk)
+            if temp_file is None and buffer.tell() + len(chunk) <= Config.SMALL_FILE_LIMIT:
+                buffer.write(chunk)
+                continue
+            
+            if temp_file is None:
+                # Never linked into the filesystem, so closing it releases the storage
+                temp_file = tempfile.TemporaryFile()
+                temp_writer = await aiofiles.open(
+                    temp_file.fileno(), 'wb', buffering=Config.TEMP_WRITE_BUFFER_SIZE, closefd=False
+                )
+                await temp_writer.write(buffer.getbuffer())
+                buffer = None
+            await temp_writer.write(chunk)
+    except Exception:
+        if temp_file is not None:
+            temp_file.close()
+        raise
+    finally:
+        if temp_writer is not None:
+            await temp_writer.close()
+    
+    upload_source = temp_file if temp_file is not None else buffer
+    upload_source.seek(0)
+    return upload_source, content_hasher.hexdigest()
+
+def _cleanup_upload(upload_source: BinaryIO):
+    """
+    Release a spooled upload, removing its temporary file if there is one. Runs
+    off the event loop, since this can block on slow or networked temp dirs.
+    """
+    try:
+        upload_source.close()
+    except OSError:
+        pass  # Ignore cleanup errors
 
-@app.post("/ocr/process", response_model=OCRResponse)
-async def process_document(file: UploadFile = File(...), background_tasks: BackgroundTasks = BackgroundTasks()):
+def _is_supported_upload(file: UploadFile) -> bool:
+    """
+    Check that an upload is an image or a PDF
     """
-    Process a document with OCR and return extracted fields with confidence score
+    return bool(file.content_type) and any(ext in file.content_type for ext in ['image/', 'application/pdf'])
+
+def _accepted_body(document_id: str, status: str) -> Dict[str, Any]:
     """
-    start_time = datetime.now()
+    Build the body returned when an upload is accepted for processing
+    """
+    return {
+        "document_id": document_id,
+        "status": status,
+        "status_url": f"/ocr/status/{document_id}",
+        "events_url": f"/ocr/events/{document_id}",
+        "result_url": f"/ocr/result/{document_id}"
+    }
+
+async def _accept_upload(state, file: UploadFile, background_tasks: BackgroundTasks) -> Tuple[int, Dict[str, Any], Optional[tuple]]:
+    """
+    Spool an upload and register it for processing. Returns the HTTP status code, the
+    response body and the pipeline arguments, or None when a stored result is reused.
+    """
+    # Generate a unique, time-ordered document ID (keeps index inserts local)
+    doc_id = uuid7().hex
     
-    # Validate file type
-    if not file.content_type or not any(ext in file.content_type for ext in ['image/', 'application/pdf']):
-        raise HTTPException(status_code=400, detail="Invalid file type. Only images and PDFs are supported.")
+    # Read the upload in chunks, keeping small files in memory. This has to happen
+    # before the response is sent, since the upload is closed afterwards.
+    upload_source, content_hash = await _spool_upload(file)
     
-    # Generate a unique document ID
-    doc_id = str(uuid.uuid4())
+    # Return the stored result if this exact file was already processed
+    cached_doc_id = await run_blocking(state.storage_manager.get_by_hash, content_hash)
+    if cached_doc_id:
+        cached_doc = await run_blocking(state.storage_manager.get_document, cached_doc_id)
+        if cached_doc:
+            # Release the upload once the response has been sent
+            background_tasks.add_task(_cleanup_upload, upload_source)
+            return 200, _accepted_body(cached_doc_id, "completed"), None
     
     # Store processing status
-    processing_status[doc_id] = {
-        "status": "processing",
-        "progress": 0,
-        "message": "File upload complete"
-    }
+    await state.status_store.set_status(doc_id, status="processing", progress=0, message="File upload complete")
+    
+    return 202, _accepted_body(doc_id, "processing"), (state, doc_id, upload_source, content_hash, file.filename)
+
+async def _run_pipeline(state, doc_id: str, upload_source: BinaryIO, content_hash: str, filename: str):
+    """
+    Run an accepted upload through the shared processing pipeline, reporting
+    progress through the status store
+    """
+    async def report_progress(progress: int, message: str):
+        await state.status_store.set_status(doc_id, progress=progress, message=message)
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        # Update processing status
-        processing_status[doc_id]["progress"] = 10
-        processing_status[doc_id]["message"] = "Starting preprocessing"
-        
-        # Preprocess image
-        processed_path = preprocessor.preprocess_document(temp_file_path)
-        
-        processing_status[doc_id]["progress"] = 30
-        processing_status[doc_id]["message"] = "Preprocessing complete, starting OCR"
-        
-        # Perform OCR
-        ocr_result = ocr_engine.process_with_multiple_engines(processed_path)
-        
-        processing_status[doc_id]["progress"] = 60
-        processing_status[doc_id]["message"] = "OCR complete, extracting fields"
-        
-        # Extract structured fields
-        extracted_fields = field_extractor.extract_fields(ocr_result["text"])
-        
-        processing_status[doc_id]["progress"] = 70
-        processing_status[doc_id]["message"] = "Field extraction complete, validating with AI"
-        
-        # Validate and correct with AI
-        ai_result = ai_verifier.validate_and_correct(extracted_fields, ocr_result["text"])
-        
-        processing_status[doc_id]["progress"] = 85
-        processing_status[doc_id]["message"] = "AI validation complete, applying rule-based validation"
-        
-        # Apply rule-based validation
-        rule_results = rule_validator.validate_fields(ai_result["validated_data"])
-        
-        # Calculate combined confidence score
-        combined_confidence = ai_verifier.calculate_combined_confidence(
-            ocr_result["confidence"],
-            ai_result["confidence_score"],
-            rule_results
+        result = await run_pipeline(
+            state,
+            upload_source,
+            doc_id,
+            filename=filename,
+            content_hash=content_hash,
+            executor=executor,
+            report_progress=report_progress
         )
         
-        processing_status[doc_id]["progress"] = 95
-        processing_status[doc_id]["message"] = "Finalizing results"
-        
-        # Determine document status based on confidence
-        if combined_confidence >= Config.AUTO_APPROVE_THRESHOLD:
-            status = "auto_approved"
-        elif combined_confidence >= Config.AI_REVIEW_THRESHOLD:
-            status = "ai_review"
-        else:
-            status = "manual_review"
-        
-        # Prepare document for storage
-        document_data = {
-            "_id": doc_id,
-            "original_filename": file.filename,
-            "document_type": extracted_fields.get("document_type", "unknown"),
-            "extracted_fields": ai_result["validated_data"],
-            "ocr_text": ocr_result["text"],
-            "ocr_engine_used": ocr_result["best_engine"],
-            "confidence": combined_confidence,
-            "status": status,
-            "ocr_confidence": ocr_result["confidence"],
-            "ai_confidence": ai_result["confidence_score"],
-            "rule_validation_results": rule_results,
-            "issues_detected": ai_result["issues_detected"],
-            "corrections_made": ai_result.get("corrections_made", {}),
-            "processing_metadata": {
-                "upload_time": start_time.isoformat(),
-                "processing_time": (datetime.now() - start_time).total_seconds()
-            }
-        }
-        
-        # Save to storage
-        storage_result = storage_manager.save_document(document_data)
-        
-        processing_status[doc_id]["progress"] = 100
-        processing_status[doc_id]["status"] = "completed"
-        processing_status[doc_id]["message"] = "Processing complete"
-        
-        # Clean up temporary files
-        os.unlink(temp_file_path)
-        if os.path.exists(processed_path) and "temp_processed" in processed_path:
-            os.unlink(processed_path)
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        return OCRResponse(
-            id=doc_id,
-            status=status,
-            extracted_fields=ai_result["validated_data"],
-            confidence_score=combined_confidence,
-            processing_time=processing_time
+        await state.status_store.set_status(
+            doc_id,
+            status="completed",
+            progress=100,
+            message="Processing complete",
+            document_status=result["status"]
         )
         
     except Exception as e:
-        processing_status[doc_id]["status"] = "failed"
-        processing_status[doc_id]["message"] = str(e)
-        
-        # Clean up temporary files in case of error
-        try:
-            if 'temp_file_path' in locals():
-                os.unlink(temp_file_path)
-            if 'processed_path' in locals() and os.path.exists(processed_path):
-                os.unlink(processed_path)
-        except:
-            pass  # Ignore cleanup errors
-        
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+        # The response has already been sent, so failures are reported through the status
+        print(f"Error processing document {doc_id}: {str(e)}")
+        await state.status_store.set_status(doc_id, status="failed", message=f"Processing failed: {str(e)}")
+    
+    finally:
+        # Release the upload after the final status has been published
+        await run_blocking(_cleanup_upload, upload_source)
+
+async def _run_pipelines(jobs: List[tuple]):
+    """
+    Run several accepted uploads through the pipeline concurrently
+    """
+    await asyncio.gather(*(_run_pipeline(*job) for job in jobs))
+
+@app.get("/")
+async def root():
+    return {"message": "Smart OCR & Verification Engine API", "status": "running"}
+
+@app.post("/ocr/process", status_code=202)
+async def process_document(request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    Accept a document for OCR processing. Processing runs in the background; poll
+    the returned status URL or subscribe to the events URL to follow its progress.
+    """
+    # Validate file type
+    if not _is_supported_upload(file):
+        raise HTTPException(status_code=400, detail="Invalid file type. Only images and PDFs are supported.")
+    
+    try:
+        status_code, body, job = await _accept_upload(request.app.state, file, background_tasks)
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    if job:
+        background_tasks.add_task(_run_pipeline, *job)
+    
+    return JSONResponse(status_code=status_code, content=body)
+
+@app.post("/ocr/process_batch", status_code=202)
+async def process_document_batch(request: Request, background_tasks: BackgroundTasks, files: List[UploadFile] = File(...)):
+    """
+    Accept several documents in one request. The documents run through the
+    pipeline concurrently in the background, sharing the worker's thread pool
+    and loaded components.
+    """
+    invalid_files = [file.filename for file in files if not _is_supported_upload(file)]
+    if invalid_files:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type for {', '.join(invalid_files)}. Only images and PDFs are supported."
+        )
+    
+    state = request.app.state
+    outcomes = await asyncio.gather(
+        *(_accept_upload(state, file, background_tasks) for file in files),
+        return_exceptions=True
+    )
+    
+    results = []
+    jobs = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            results.append({"filename": file.filename, "success": False, "error": str(outcome)})
+        else:
+            _, body, job = outcome
+            results.append({"filename": file.filename, "success": True, "result": body})
+            if job:
+                jobs.append(job)
+    
+    # A single task so the documents are processed concurrently rather than one by one
+    if jobs:
+        background_tasks.add_task(_run_pipelines, jobs)
+    
+    return JSONResponse(status_code=202, content={"results": results, "count": len(results)})
 
 @app.get("/ocr/status/{document_id}")
-async def get_processing_status(document_id: str):
+async def get_processing_status(document_id: str, request: Request):
     """
     Get the processing status of a document
     """
-    if document_id in processing_status:
-        return processing_status[document_id]
+    state = request.app.state
+    status = await state.status_store.get_status(document_id)
+    if status:
+        return status
     else:
         # Check if document exists in storage
-        doc = storage_manager.get_document(document_id)
+        doc = await run_blocking(state.storage_manager.get_document, document_id)
         if doc:
             return {
                 "status": "completed",
@@ -272,60 +387,77 @@ async def get_processing_status(document_id: str):
         else:
             raise HTTPException(status_code=404, detail="Document not found")
 
+@app.get("/ocr/events/{document_id}")
+async def stream_processing_events(document_id: str, request: Request):
+    """
+    Stream the processing status of a document as server-sent events until it
+    completes or fails
+    """
+    state = request.app.state
+    if not await state.status_store.get_status(document_id):
+        doc = await run_blocking(state.storage_manager.get_document, document_id)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Document not found")
+    
+    async def event_stream():
+        last_status = None
+        while not await request.is_disconnected():
+            status = await state.status_store.get_status(document_id)
+            if status is None:
+                # Status expired or the document was processed before the status
+                # store was populated, so it is already stored
+                status = {"status": "completed", "progress": 100}
+            
+            if status != last_status:
+                yield f"event: status\ndata: {orjson.dumps(status).decode()}\n\n"
+                last_status = dict(status)
+            
+            if status.get("status") in ("completed", "failed"):
+                break
+            
+            await asyncio.sleep(Config.STATUS_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/ocr/result/{document_id}", response_model=OCRResponse)
-async def get_ocr_result(document_id: str):
+async def get_ocr_result(document_id: str, request: Request):
     """
     Get the OCR result for a processed document
     """
-    doc = storage_manager.get_document(document_id)
+    state = request.app.state
+    doc = await run_blocking(state.storage_manager.get_document, document_id)
     
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Handle both cases where doc is from PG or combined
-    if 'full_data' in doc:
-        # This is a combined result
-        extracted_fields = doc['full_data'].get('extracted_fields', {})
-        confidence_score = doc['full_data'].get('confidence', 0.0)
-    else:
-        # This is a PG-only result
-        extracted_fields = doc.get('extracted_fields', {})
-        confidence_score = float(doc.get('confidence', 0.0)) if doc.get('confidence') is not None else 0.0
-    
-    return OCRResponse(
-        id=document_id,
-        status=doc.get('status', 'unknown'),
-        extracted_fields=extracted_fields,
-        confidence_score=confidence_score,
-        processing_time=doc.get('processing_metadata', {}).get('processing_time', 0.0)
-    )
+    return _build_ocr_response(document_id, doc)
 
 @app.post("/ocr/validate", response_model=ValidationResult)
-async def validate_document(request: ValidationRequest):
+async def validate_document(request: ValidationRequest, http_request: Request):
     """
     Validate and potentially update a document's extracted fields
     """
-    # Get the existing document
-    doc = storage_manager.get_document(request.document_id)
+    state = http_request.app.state
+    
+    if request.manual_corrections:
+        # Apply the manual corrections and status in one update that returns the document
+        new_status = "manually_approved" if request.document_id.startswith('manual') else None
+        doc = await run_blocking(
+            state.storage_manager.get_and_update_status,
+            request.document_id,
+            request.manual_corrections,
+            new_status
+        )
+    else:
+        doc = await run_blocking(state.storage_manager.get_document, request.document_id)
     
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Apply manual corrections if provided
-    if request.manual_corrections:
-        # Update the document with manual corrections
-        if 'full_data' in doc:
-            current_fields = doc['full_data']['extracted_fields']
-        else:
-            current_fields = doc.get('extracted_fields', {})
-        
-        for field, correction in request.manual_corrections.items():
-            current_fields[field] = correction
-        
-        # Update the document status
-        new_status = "manually_approved" if request.document_id.startswith('manual') else doc.get('status', 'processed')
-        storage_manager.update_document_status(request.document_id, new_status)
-    
     # Return validation result
     return ValidationResult(
         document_id=request.document_id,
@@ -337,18 +469,29 @@ async def validate_document(request: ValidationRequest):
 
 @app.get("/ocr/search")
 async def search_documents(
+    request: Request,
     name: Optional[str] = None,
+    id_number: Optional[str] = None,
+    address: Optional[str] = None,
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     confidence_min: Optional[float] = None,
-    confidence_max: Optional[float] = None
+    confidence_max: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
     """
-    Search for processed documents with various filters
+    Search for processed documents with various filters. Results are paged by
+    the database with limit and offset.
     """
+    state = request.app.state
     filters = {}
     if name:
         filters['name'] = name
+    if id_number:
+        filters['id_number'] = id_number
+    if address:
+        filters['address'] = address
     if document_type:
         filters['document_type'] = document_type
     if status:
@@ -358,12 +501,15 @@ async def search_documents(
     if confidence_max is not None:
         filters['confidence_max'] = confidence_max
     
-    results = storage_manager.search_documents(filters)
-    return {"results": results, "count": len(results)}
+    # Only the requested page is fetched; the rows stream off the server-side cursor
+    results = await run_blocking(
+        lambda: list(state.storage_manager.search_documents(filters, limit, offset))
+    )
+    return {"results": results, "count": len(results), "limit": limit, "offset": offset}
 
 # Health check endpoint
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -371,10 +517,13 @@ async def health_check():
             "ocr_engine": "available",
             "preprocessor": "available",
             "ai_verifier": "available" if Config.OPENAI_API_KEY else "not configured",
-            "storage": "available"
+            "storage": "available",
+            # Saves this worker dropped after every MongoDB write attempt failed
+            "failed_document_writes": request.app.state.storage_manager.mongo_storage.failed_document_writes
         }
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Each worker is a separate process, so CPU-bound OCR runs on all cores
+    uvicorn.run("api.main:app", host="0.0.0.0", port=8000, workers=Config.API_WORKERS)
\ No newline at end of file
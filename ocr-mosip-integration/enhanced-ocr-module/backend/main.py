@@ -3,10 +3,18 @@ Main entry point for the Smart OCR & Verification Engine
 """
 import os
 import sys
-from typing import Dict, Any
-import tempfile
-import uuid
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+from uuid6 import uuid7
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiomultiprocess
+    from aiomultiprocess import Pool
+    AIOMULTIPROCESS_AVAILABLE = True
+except ImportError:
+    AIOMULTIPROCESS_AVAILABLE = False
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +24,7 @@ from backend.preprocessing.preprocessor import DocumentPreprocessor
 from backend.ocr_engine.field_extractor import FieldExtractor
 from backend.verification.ai_verifier import AIVerifier, RuleBasedValidator
 from backend.storage.data_storage import DataStorageManager
+from backend.pipeline import run_pipeline
 from config.settings import Config
 
 
@@ -31,109 +40,50 @@ class SmartOCREngine:
         self.ai_verifier = AIVerifier()
         self.rule_validator = RuleBasedValidator()
         self.storage_manager = DataStorageManager()
+        self.executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        # Event loop for the synchronous entry points. The AI verifier's async
+        # client keeps its connection pool on the loop it first ran on, so every
+        # call has to reuse the same loop rather than start a new one.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def _print_progress(self, progress: int, message: str):
+        print(f"[{progress:3d}%] {message}")
+    
+    async def process_document_async(self, file_path: str, confidence_threshold: float = Config.MANUAL_REVIEW_THRESHOLD) -> Dict[str, Any]:
+        """
+        Process a document through the entire pipeline without blocking the event
+        loop; blocking stages run in the engine's thread pool
+        """
+        result = await run_pipeline(
+            self,
+            file_path,
+            uuid7().hex,
+            filename=os.path.basename(file_path),
+            executor=self.executor,
+            report_progress=self._print_progress,
+            metadata={"input_file_path": file_path}
+        )
+        
+        print(f"Processing completed in {result['processing_time']:.2f} seconds")
+        return result
     
     def process_document(self, file_path: str, confidence_threshold: float = Config.MANUAL_REVIEW_THRESHOLD) -> Dict[str, Any]:
         """
         Process a document through the entire pipeline
         """
-        start_time = datetime.now()
-        
-        try:
-            # Step 1: Preprocess image
-            print("Step 1: Preprocessing image...")
-            processed_path = self.preprocessor.preprocess_document(file_path)
-            
-            # Step 2: Perform OCR
-            print("Step 2: Performing OCR...")
-            ocr_result = self.ocr_engine.process_with_multiple_engines(processed_path)
-            
-            if not ocr_result["success"]:
-                raise Exception(f"OCR failed: {ocr_result.get('error', 'Unknown error')}")
-            
-            # Step 3: Extract structured fields
-            print("Step 3: Extracting structured fields...")
-            extracted_fields = self.field_extractor.extract_fields(ocr_result["text"])
-            
-            # Step 4: AI validation and correction
-            print("Step 4: Validating with AI...")
-            ai_result = self.ai_verifier.validate_and_correct(extracted_fields, ocr_result["text"])
-            
-            # Step 5: Rule-based validation
-            print("Step 5: Applying rule-based validation...")
-            rule_results = self.rule_validator.validate_fields(ai_result["validated_data"])
-            
-            # Step 6: Calculate combined confidence
-            print("Step 6: Calculating confidence score...")
-            combined_confidence = self.ai_verifier.calculate_combined_confidence(
-                ocr_result["confidence"],
-                ai_result["confidence_score"],
-                rule_results
-            )
-            
-            # Step 7: Determine document status
-            if combined_confidence >= Config.AUTO_APPROVE_THRESHOLD:
-                status = "auto_approved"
-            elif combined_confidence >= Config.AI_REVIEW_THRESHOLD:
-                status = "ai_review"
-            else:
-                status = "manual_review"
-            
-            # Step 8: Prepare document for storage
-            doc_id = str(uuid.uuid4())
-            document_data = {
-                "_id": doc_id,
-                "original_filename": os.path.basename(file_path),
-                "document_type": extracted_fields.get("document_type", "unknown"),
-                "extracted_fields": ai_result["validated_data"],
-                "ocr_text": ocr_result["text"],
-                "ocr_engine_used": ocr_result["best_engine"],
-                "confidence": combined_confidence,
-                "status": status,
-                "ocr_confidence": ocr_result["confidence"],
-                "ai_confidence": ai_result["confidence_score"],
-                "rule_validation_results": rule_results,
-                "issues_detected": ai_result["issues_detected"],
-                "corrections_made": ai_result.get("corrections_made", {}),
-                "processing_metadata": {
-                    "input_file_path": file_path,
-                    "processing_time": (datetime.now() - start_time).total_seconds(),
-                    "processed_at": start_time.isoformat()
-                }
-            }
-            
-            # Step 9: Save to storage
-            print("Step 7: Saving to storage...")
-            storage_result = self.storage_manager.save_document(document_data)
-            
-            # Clean up temporary files
-            if "temp_processed" in processed_path:
-                os.unlink(processed_path)
-            
-            processing_time = (datetime.now() - start_time).total_seconds()
-            
-            result = {
-                "document_id": doc_id,
-                "status": status,
-                "extracted_fields": ai_result["validated_data"],
-                "confidence_score": combined_confidence,
-                "processing_time": processing_time,
-                "ocr_engine_used": ocr_result["best_engine"],
-                "issues_detected": ai_result["issues_detected"],
-                "corrections_made": ai_result.get("corrections_made", {})
-            }
-            
-            print(f"Processing completed in {processing_time:.2f} seconds")
-            return result
-            
-        except Exception as e:
-            # Clean up any temporary files in case of error
-            try:
-                if 'processed_path' in locals() and os.path.exists(processed_path):
-                    os.unlink(processed_path)
-            except:
-                pass  # Ignore cleanup errors
-            
-            raise e
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.process_document_async(file_path, confidence_threshold))
+    
+    def close(self):
+        """
+        Shut down the engine's event loop and thread pool
+        """
+        if self._loop is not None:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+            self._loop = None
+        self.executor.shutdown(wait=False)
     
     def validate_existing_document(self, document_id: str, manual_corrections: Dict[str, str] = None) -> Dict[str, Any]:
         """
@@ -168,20 +118,75 @@ class SmartOCREngine:
         }
 
 
+# Engine of a batch worker process, loaded once per process
+_worker_engine = None
+
+
+def _init_batch_worker(engine_class: Callable[[], Any]):
+    global _worker_engine
+    _worker_engine = engine_class()
+
+
+async def _process_in_worker(file_path: str) -> Dict[str, Any]:
+    return await _worker_engine.process_document_async(file_path)
+
+
+async def process_batch_async(file_paths: List[str], processes: Optional[int] = None,
+                              engine_class: Optional[Callable[[], Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Process many documents across CPU cores. Each worker process loads its own
+    engine and runs several documents concurrently on its own event loop, so the
+    CPU-bound stages use every core while the I/O-bound ones overlap. Without
+    aiomultiprocess the documents run concurrently in this process instead.
+    engine_class defaults to SmartOCREngine and must be picklable by reference.
+    """
+    engine_class = engine_class or SmartOCREngine
+    if not AIOMULTIPROCESS_AVAILABLE:
+        engine = engine_class()
+        return list(await asyncio.gather(*(engine.process_document_async(path) for path in file_paths)))
+    
+    # Fork workers from a slim fork server rather than starting a fresh
+    # interpreter for each (spawn) or copying this process with its loaded
+    # engine (fork); Windows only has spawn
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        aiomultiprocess.set_start_method('forkserver')
+    
+    processes = min(processes or os.cpu_count() or 1, len(file_paths))
+    async with Pool(processes=processes, initializer=_init_batch_worker, initargs=(engine_class,),
+                    childconcurrency=Config.BATCH_CHILD_CONCURRENCY) as pool:
+        return await pool.map(_process_in_worker, file_paths)
+
+
+def process_batch(file_paths: List[str], processes: Optional[int] = None,
+                  engine_class: Optional[Callable[[], Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Process many documents through the entire pipeline
+    """
+    return asyncio.run(process_batch_async(file_paths, processes, engine_class))
+
+
 def main():
     """
     Example usage of the Smart OCR Engine
     """
     if len(sys.argv) < 2:
-        print("Usage: python main.py <image_path>")
+        print("Usage: python main.py <image_path> [<image_path> ...]")
         return
     
-    image_path = sys.argv[1]
+    missing = [path for path in sys.argv[1:] if not os.path.exists(path)]
+    if missing:
+        print(f"Error: File {missing[0]} does not exist")
+        return
     
-    if not os.path.exists(image_path):
-        print(f"Error: File {image_path} does not exist")
+    if len(sys.argv) > 2:
+        # Several documents: spread them over worker processes
+        results = process_batch(sys.argv[1:])
+        for path, result in zip(sys.argv[1:], results):
+            print(f"{path}: {result['status']} ({result['confidence_score']:.2f}), document ID {result['document_id']}")
         return
     
+    image_path = sys.argv[1]
+    
     # Initialize the OCR engine
     ocr_engine = SmartOCREngine()
     
@@ -205,6 +210,8 @@ def main():
             
     except Exception as e:
         print(f"Error processing document: {str(e)}")
+    finally:
+        ocr_engine.close()
 
 
 if __name__ == "__main__":
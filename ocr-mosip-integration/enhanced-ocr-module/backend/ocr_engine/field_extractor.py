@@ -1,7 +1,99 @@
+import functools
 import re
 from typing import Dict, List, Any, Optional
 from config.settings import FIELD_KEYWORDS, VALIDATION_PATTERNS
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Regexes that do not depend on configuration, compiled once at import
+_DOB_KEYWORD = r'(?:date of birth|birth date|dob|d\.o\.b\.?|birth)\s*[:\-]?\s*'
+_DMY_DATE = r'\d{2}[\/\-\s]\d{2}[\/\-\s]\d{4}'  # DD/MM/YYYY or DD-MM-YYYY
+_YMD_DATE = r'\d{4}[\/\-\s]\d{2}[\/\-\s]\d{2}'  # YYYY/MM/DD
+_TEXTUAL_DATE = r'\d{1,2}[a-z]{2}\s+[a-z]+\s+\d{4}'  # 12th Jan 1990
+# Date of birth formats in order of preference: keyword-anchored dates first,
+# then general dates. Each is scanned separately; merged into one alternation,
+# a match of one format could swallow the start of a preferred one.
+_DOB_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    rf'{_DOB_KEYWORD}({_DMY_DATE})',
+    rf'{_DOB_KEYWORD}({_YMD_DATE})',
+    rf'{_DOB_KEYWORD}({_TEXTUAL_DATE})',
+    rf'({_DMY_DATE})',
+    rf'({_YMD_DATE})',
+))
+_POTENTIAL_NAME_RE = re.compile(r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b')
+_PAN_RE = re.compile(r'[A-Z]{5}[0-9]{4}[A-Z]')
+_AADHAAR_RE = re.compile(r'\d{4}\s?\d{4}\s?\d{4}')
+_PASSPORT_RE = re.compile(r'[A-Z]{1}[0-9]{7}')
+_ID_SEPARATOR_RE = re.compile(r'[\s\-]+')
+_SEP_RE = re.compile(r'[\/\-\s]+')
+
+# Common document types, in order of precedence when several match
+_DOCUMENT_TYPE_KEYWORDS = {
+    'aadhaar': ['aadhaar', 'uidai'],
+    'pan': ['pan', 'permanent account number'],
+    'passport': ['passport'],
+    'driving_license': ['driving license', 'dl'],
+    'voter_id': ['voter id', 'epic'],
+    'ration_card': ['ration card', 'pds'],
+    'bank_statement': ['bank statement'],
+    'income_tax': ['income tax', 'itr'],
+    'salary_slip': ['salary slip', 'pay slip'],
+}
+_ADDRESS_INDICATORS = ['street', 'road', 'lane', 'colony', 'nagar', 'marg', 'house', 'flat', 'building', 'city', 'state', 'pin', 'zip']
+# Substring match, like the indicator list it is built from ('pin' also finds 'pincode')
+_ADDRESS_INDICATOR_RE = re.compile('|'.join(_ADDRESS_INDICATORS), re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _matches_id_format(id_number_clean: str, patterns: tuple) -> bool:
+    """
+    Check a cleaned ID candidate against compiled ID patterns. Candidates repeat
+    across keyword attempts, so results are memoized.
+    """
+    return any(pattern.match(id_number_clean) for pattern in patterns)
+
+
+def _build_automaton(entries):
+    """
+    Build an Aho-Corasick automaton from (keyword, value) pairs
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword, value in entries:
+        automaton.add_word(keyword, value)
+    automaton.make_automaton()
+    return automaton
+
+
+# Everything derived from the static configuration is built once at import, so
+# creating a FieldExtractor costs nothing
+_NAME_PATTERNS = tuple(
+    re.compile(rf'{re.escape(keyword)}[.:]?\s*([A-Z][a-zA-Z\s]+)', re.IGNORECASE)
+    for keyword in FIELD_KEYWORDS['name']
+)
+_ID_PATTERNS = tuple(
+    re.compile(rf'{re.escape(keyword)}[.:]?\s*([A-Z0-9\s\-]+)', re.IGNORECASE)
+    for keyword in FIELD_KEYWORDS['id_number']
+)
+_ADDRESS_PATTERNS = tuple(
+    re.compile(rf'{re.escape(keyword)}[.:]?\s*([A-Za-z0-9\s,#\-\.]+?)(?:\n|$|(?=\n[A-Z]))', re.IGNORECASE | re.DOTALL)
+    for keyword in FIELD_KEYWORDS['address']
+)
+# A tuple, so it can be part of the memoized validation key
+_ID_FORMAT_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern_name, pattern in VALIDATION_PATTERNS.items()
+    if pattern_name in ['pan', 'aadhaar', 'passport']
+)
+_DOC_TYPE_PRECEDENCE = {doc_type: i for i, doc_type in enumerate(_DOCUMENT_TYPE_KEYWORDS)}
+# Document type lookup scans the text once for all keywords when pyahocorasick is installed
+_DOC_TYPE_AUTOMATON = _build_automaton(
+    (keyword, doc_type) for doc_type, keywords in _DOCUMENT_TYPE_KEYWORDS.items() for keyword in keywords
+) if AHOCORASICK_AVAILABLE else None
+
 
 class FieldExtractor:
     """
@@ -11,6 +103,14 @@ class FieldExtractor:
     def __init__(self):
         self.field_keywords = FIELD_KEYWORDS
         self.validation_patterns = VALIDATION_PATTERNS
+        
+        # Prebuilt at import; bound here so the extraction methods stay unchanged
+        self._name_patterns = _NAME_PATTERNS
+        self._id_patterns = _ID_PATTERNS
+        self._address_patterns = _ADDRESS_PATTERNS
+        self._id_format_patterns = _ID_FORMAT_PATTERNS
+        self._doc_type_precedence = _DOC_TYPE_PRECEDENCE
+        self._doc_type_automaton = _DOC_TYPE_AUTOMATON
     
     def extract_fields(self, text: str) -> Dict[str, Any]:
         """
@@ -18,6 +118,10 @@ class FieldExtractor:
         """
         extracted_fields = {}
         
+        # Case-folded copy and lines are shared by the extractors below
+        text_lower = text.lower()
+        lines = text.split('\n')
+        
         # Extract name
         extracted_fields['name'] = self._extract_name(text)
         
@@ -28,10 +132,10 @@ class FieldExtractor:
         extracted_fields['id_number'] = self._extract_id_number(text)
         
         # Extract address
-        extracted_fields['address'] = self._extract_address(text)
+        extracted_fields['address'] = self._extract_address(text, lines)
         
         # Extract document type
-        extracted_fields['document_type'] = self._extract_document_type(text)
+        extracted_fields['document_type'] = self._extract_document_type(text, text_lower)
         
         # Clean up empty fields
         cleaned_fields = {k: v for k, v in extracted_fields.items() if v}
@@ -42,48 +146,38 @@ class FieldExtractor:
         """
         Extract name using keywords and pattern recognition
         """
-        text_lower = text.lower()
+        name = self._find_keyword_name(text)
         
-        # Look for name keywords
-        for keyword in self.field_keywords['name']:
-            pattern = rf'{re.escape(keyword)}[.:]?\s*([A-Z][a-zA-Z\s]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                # Return the first match that looks like a name (not too long)
-                for match in matches:
-                    name = match.strip()
-                    if 5 <= len(name) <= 50 and len(name.split()) >= 2:
-                        return name.title()
-        
-        # If no keyword found, look for potential names in the text
-        # Look for capitalized words that might be names
-        potential_names = re.findall(r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b', text)
-        if potential_names:
-            return potential_names[0].title()
+        if name is None:
+            # If no keyword found, look for capitalized words that might be names
+            match = _POTENTIAL_NAME_RE.search(text)
+            if match:
+                name = match.group(1)
         
+        return name.title() if name else None
+    
+    def _find_keyword_name(self, text: str) -> Optional[str]:
+        """
+        First keyword-anchored match that looks like a name (not too long)
+        """
+        # Matches are produced lazily, so scanning stops at the first valid name
+        for pattern in self._name_patterns:
+            for match in pattern.finditer(text):
+                name = match.group(1).strip()
+                if 5 <= len(name) <= 50 and len(name.split()) >= 2:
+                    return name
         return None
     
     def _extract_date_of_birth(self, text: str) -> Optional[str]:
         """
         Extract date of birth using various formats
         """
-        # Common date patterns
-        patterns = [
-            r'(?:date of birth|birth date|dob|d\.o\.b\.?|birth)\s*[:\-]?\s*(\d{2}[\/\-\s]\d{2}[\/\-\s]\d{4})',  # DD/MM/YYYY or DD-MM-YYYY
-            r'(?:date of birth|birth date|dob|d\.o\.b\.?|birth)\s*[:\-]?\s*(\d{4}[\/\-\s]\d{2}[\/\-\s]\d{2})',  # YYYY/MM/DD
-            r'(?:date of birth|birth date|dob|d\.o\.b\.?|birth)\s*[:\-]?\s*(\d{1,2}[a-z]{2}\s+[a-z]+\s+\d{4})',  # 12th Jan 1990
-            r'(\d{2}[\/\-\s]\d{2}[\/\-\s]\d{4})',  # General date format
-            r'(\d{4}[\/\-\s]\d{2}[\/\-\s]\d{2})',  # General date format (YYYY-MM-DD)
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
+        for pattern in _DOB_PATTERNS:
+            for match in pattern.finditer(text):
                 # Validate and format the date
-                for match in matches:
-                    formatted_date = self._format_date(match)
-                    if formatted_date:
-                        return formatted_date
+                formatted_date = self._format_date(match.group(1))
+                if formatted_date:
+                    return formatted_date
         
         return None
     
@@ -91,62 +185,51 @@ class FieldExtractor:
         """
         Format date string to YYYY-MM-DD format
         """
-        # Remove extra spaces and normalize separators
-        date_str = re.sub(r'[\s]+', ' ', date_str.strip())
-        date_str = re.sub(r'[\/\-\s]+', '-', date_str)
-        
-        # Handle different formats
-        parts = date_str.split('-')
-        
-        if len(parts) == 3:
-            day, month, year = parts[0], parts[1], parts[2]
-            
-            # Check if it's DD-MM-YYYY or MM-DD-YYYY format
-            # Usually DOB has year as 4 digits at the end
-            if len(year) == 4 and year.isdigit():
-                # Format: DD-MM-YYYY or MM-DD-YYYY (assuming DD-MM-YYYY)
-                day = day.zfill(2)
-                month = month.zfill(2)
-                year = year.zfill(4)
-                return f"{year}-{month}-{day}"
-            elif len(parts[0]) == 4 and parts[0].isdigit():
-                # Format: YYYY-MM-DD
-                year = parts[0].zfill(4)
-                month = parts[1].zfill(2)
-                day = parts[2].zfill(2)
-                return f"{year}-{month}-{day}"
+        # Normalize separators; runs of spaces, slashes and dashes become one dash
+        parts = _SEP_RE.sub('-', date_str.strip()).split('-')
         
-        return None
+        if len(parts) != 3:
+            return None
+        
+        # Usually DOB has year as 4 digits at the end
+        if len(parts[2]) == 4 and parts[2].isdigit():
+            # Format: DD-MM-YYYY or MM-DD-YYYY (assuming DD-MM-YYYY)
+            day, month, year = parts
+        elif len(parts[0]) == 4 and parts[0].isdigit():
+            # Format: YYYY-MM-DD
+            year, month, day = parts
+        else:
+            return None
+        
+        return '{:0>4}-{:0>2}-{:0>2}'.format(year, month, day)
     
     def _extract_id_number(self, text: str) -> Optional[str]:
         """
         Extract ID number (PAN, Aadhaar, Passport, etc.)
         """
+        # Look for ID keywords
+        for pattern in self._id_patterns:
+            for match in pattern.finditer(text):
+                id_candidate = _ID_SEPARATOR_RE.sub('', match.group(1).strip())
+                if self._validate_id_format(id_candidate):
+                    return id_candidate
+        
+        # Look for potential ID numbers without keywords; only these need the
+        # upper-cased copy
         text_upper = text.upper()
         
-        # Look for ID keywords
-        for keyword in self.field_keywords['id_number']:
-            pattern = rf'{re.escape(keyword)}[.:]?\s*([A-Z0-9\s\-]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    id_candidate = re.sub(r'[\s\-]+', '', match.strip())
-                    if self._validate_id_format(id_candidate):
-                        return id_candidate
-        
-        # Look for potential ID numbers without keywords
         # PAN pattern
-        pan_matches = re.findall(r'[A-Z]{5}[0-9]{4}[A-Z]', text_upper)
+        pan_matches = _PAN_RE.findall(text_upper)
         if pan_matches:
             return pan_matches[0]
         
         # Aadhaar pattern
-        aadhaar_matches = re.findall(r'\d{4}\s?\d{4}\s?\d{4}', text)
+        aadhaar_matches = _AADHAAR_RE.findall(text)
         if aadhaar_matches:
             return aadhaar_matches[0].replace(' ', '')
         
         # Passport pattern
-        passport_matches = re.findall(r'[A-Z]{1}[0-9]{7}', text_upper)
+        passport_matches = _PASSPORT_RE.findall(text_upper)
         if passport_matches:
             return passport_matches[0]
         
@@ -156,65 +239,53 @@ class FieldExtractor:
         """
         Validate ID number format
         """
-        id_number_clean = re.sub(r'[\s\-]+', '', id_number)
+        id_number_clean = _ID_SEPARATOR_RE.sub('', id_number)
         
         # Check against known patterns
-        for pattern_name, pattern in self.validation_patterns.items():
-            if pattern_name in ['pan', 'aadhaar', 'passport']:
-                if re.match(pattern, id_number_clean, re.IGNORECASE):
-                    return True
-        
-        return False
+        return _matches_id_format(id_number_clean, self._id_format_patterns)
     
-    def _extract_address(self, text: str) -> Optional[str]:
+    def _extract_address(self, text: str, lines: Optional[List[str]] = None) -> Optional[str]:
         """
         Extract address using keywords and context
         """
-        text_lower = text.lower()
-        
         # Look for address keywords
-        for keyword in self.field_keywords['address']:
-            # Look for address after keyword
-            pattern = rf'{re.escape(keyword)}[.:]?\s*([A-Za-z0-9\s,#\-\.]+?)(?:\n|$|(?=\n[A-Z]))'
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                address = matches[0].strip()
+        for pattern in self._address_patterns:
+            # Look for address after keyword; only the first occurrence is considered
+            match = pattern.search(text)
+            if match:
+                address = match.group(1).strip()
                 if len(address) > 10:  # Address should be reasonably long
                     return address
         
         # If no keyword found, look for potential addresses
         # Look for patterns that might indicate addresses
         # This is a simplified approach - real implementation would need more sophisticated NLP
-        lines = text.split('\n')
+        if lines is None:
+            lines = text.split('\n')
         for line in lines:
             line = line.strip()
-            if len(line) > 15:  # Reasonable length for address
-                # Check if line contains common address indicators
-                if any(indicator in line.lower() for indicator in ['street', 'road', 'lane', 'colony', 'nagar', 'marg', 'house', 'flat', 'building', 'city', 'state', 'pin', 'zip']):
-                    return line
+            # Reasonable length for address, containing a common address indicator
+            if len(line) > 15 and _ADDRESS_INDICATOR_RE.search(line):
+                return line
         
         return None
     
-    def _extract_document_type(self, text: str) -> Optional[str]:
+    def _extract_document_type(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
         """
         Extract document type
         """
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        if self._doc_type_automaton is not None:
+            # One pass finds every keyword; keep the type with the highest precedence
+            found_types = {doc_type for _, doc_type in self._doc_type_automaton.iter(text_lower)}
+            if found_types:
+                doc_type = min(found_types, key=self._doc_type_precedence.__getitem__)
+                return doc_type.title().replace('_', ' ')
+            return None
         
-        # Common document types
-        doc_types = {
-            'aadhaar': ['aadhaar', 'uidai'],
-            'pan': ['pan', 'permanent account number'],
-            'passport': ['passport'],
-            'driving_license': ['driving license', 'dl'],
-            'voter_id': ['voter id', 'epic'],
-            'ration_card': ['ration card', 'pds'],
-            'bank_statement': ['bank statement'],
-            'income_tax': ['income tax', 'itr'],
-            'salary_slip': ['salary slip', 'pay slip'],
-        }
-        
-        for doc_type, keywords in doc_types.items():
+        for doc_type, keywords in _DOCUMENT_TYPE_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in text_lower:
                     return doc_type.title().replace('_', ' ')
@@ -1,15 +1,29 @@
 import cv2
 import numpy as np
 import pytesseract
-from PIL import Image
 import io
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Callable, Union, BinaryIO
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+import asyncio
 from google.cloud import vision
 import boto3
+from backend.preprocessing.preprocessor import ImagePreprocessor
 from config.settings import Config
 
+# A file path, encoded image bytes or file object, or an image that has already been preprocessed
+OCRInput = Union[str, bytes, BinaryIO, np.ndarray]
+# Local preprocessing for Tesseract, run only when Tesseract is needed
+Preprocess = Callable[[OCRInput], np.ndarray]
+
+
 class OCREngine:
-    def __init__(self):
+    # Single uniform block of text, LSTM engine
+    TESSERACT_CONFIG = '--psm 6 --oem 1'
+    # Reported for Tesseract text when per-word confidences are not computed
+    TESSERACT_DEFAULT_CONFIDENCE = 0.9
+    
+    def __init__(self, noise_level: str = Config.DENOISE_LEVEL):
+        self.image_preprocessor = ImagePreprocessor(noise_level)
         self.google_vision_client = None
         self.aws_textract_client = None
         self._init_clients()
@@ -36,54 +50,45 @@ class OCREngine:
         except Exception as e:
             print(f"Failed to initialize AWS Textract client: {e}")
     
-    def preprocess_image(self, image_path: str) -> np.ndarray:
+    def preprocess_image(self, image_path: Union[str, bytes]) -> np.ndarray:
         """
         Preprocess image for better OCR results
         """
-        # Read image
-        img = cv2.imread(image_path)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Apply noise reduction
-        denoised = cv2.fastNlMeansDenoising(gray)
-        
-        # Correct skew
-        coords = np.column_stack(np.where(denoised > 0))
-        angle = cv2.minAreaRect(coords)[-1]
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
-            
-        (h, w) = denoised.shape[:2]
-        center = (w // 2, h // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(denoised, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-        
-        # Normalize contrast
-        normalized = cv2.equalizeHist(rotated)
-        
-        # Resize to optimal DPI (300 DPI)
-        height, width = normalized.shape
-        scale_factor = 300 / 72  # Assuming original was 72 DPI
-        new_width = int(width * scale_factor)
-        new_height = int(height * scale_factor)
-        resized = cv2.resize(normalized, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-        
-        return resized
+        if isinstance(image_path, bytes):
+            # Encoded image already in memory, decoded without touching the disk
+            image_path = io.BytesIO(image_path)
+        # Same fused pipeline as the image preprocessor: grayscale decode, denoise,
+        # deskew, in-place Otsu binarization for Tesseract and a single upscale at the end
+        img, dpi = self.image_preprocessor._load_image(image_path)
+        return self.image_preprocessor.preprocess_array(img, dpi)
     
-    def google_vision_ocr(self, image_path: str) -> Dict[str, any]:
+    def _read_image_bytes(self, image_source: OCRInput) -> bytes:
         """
-        Perform OCR using Google Vision API
+        Raw image bytes for the cloud engines, which do their own preprocessing.
+        Preprocessed arrays are PNG-encoded in memory.
+        """
+        if isinstance(image_source, bytes):
+            return image_source
+        if hasattr(image_source, 'read'):
+            image_source.seek(0)
+            return image_source.read()
+        if isinstance(image_source, np.ndarray):
+            success, encoded = cv2.imencode('.png', image_source)
+            if not success:
+                raise ValueError("Could not encode image for cloud OCR")
+            return encoded.tobytes()
+        with io.open(image_source, 'rb') as image_file:
+            return image_file.read()
+    
+    def google_vision_ocr(self, image_source: Union[str, bytes]) -> Dict[str, any]:
+        """
+        Perform OCR using Google Vision API on an image path or raw image bytes
         """
         if not self.google_vision_client:
             return {"text": "", "confidence": 0.0, "success": False, "error": "Google Vision client not initialized"}
         
         try:
-            with io.open(image_path, 'rb') as image_file:
-                content = image_file.read()
+            content = self._read_image_bytes(image_source)
             
             image = vision.Image(content=content)
             response = self.google_vision_client.text_detection(image=image)
@@ -99,16 +104,15 @@ class OCREngine:
         except Exception as e:
             return {"text": "", "confidence": 0.0, "success": False, "error": str(e)}
     
-    def aws_textract_ocr(self, image_path: str) -> Dict[str, any]:
+    def aws_textract_ocr(self, image_source: Union[str, bytes]) -> Dict[str, any]:
         """
-        Perform OCR using AWS Textract
+        Perform OCR using AWS Textract on an image path or raw image bytes
         """
         if not self.aws_textract_client:
             return {"text": "", "confidence": 0.0, "success": False, "error": "AWS Textract client not initialized"}
         
         try:
-            with open(image_path, 'rb') as image_file:
-                image_bytes = image_file.read()
+            image_bytes = self._read_image_bytes(image_source)
             
             response = self.aws_textract_client.detect_document_text(
                 Document={'Bytes': image_bytes}
@@ -136,64 +140,178 @@ class OCREngine:
         except Exception as e:
             return {"text": "", "confidence": 0.0, "success": False, "error": str(e)}
     
-    def tesseract_ocr(self, image_path: str) -> Dict[str, any]:
+    def tesseract_ocr(self, image_path: Union[str, bytes]) -> Dict[str, any]:
         """
         Perform OCR using Tesseract (offline)
         """
         try:
             # Preprocess image for better results
             processed_img = self.preprocess_image(image_path)
+        except Exception as e:
+            return {"text": "", "confidence": 0.0, "success": False, "error": str(e)}
+        
+        return self.tesseract_ocr_from_array(processed_img)
+    
+    def tesseract_ocr_from_array(self, processed_img: np.ndarray) -> Dict[str, any]:
+        """
+        Perform OCR using Tesseract on an already preprocessed image
+        """
+        try:
+            # pytesseract takes the array directly
+            full_text = pytesseract.image_to_string(processed_img, config=self.TESSERACT_CONFIG).strip()
             
-            # Convert to PIL Image for pytesseract
-            pil_img = Image.fromarray(processed_img)
-            
-            # Extract text with confidence scores
-            data = pytesseract.image_to_data(pil_img, output_type=pytesseract.Output.DICT)
-            
-            text_parts = []
-            confidences = []
-            
-            for i, text in enumerate(data['text']):
-                if int(data['conf'][i]) > 0:  # Only include text with confidence > 0
-                    text_parts.append(text)
-                    confidences.append(int(data['conf'][i]))
-            
-            full_text = ' '.join(text_parts)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+            # Per-word confidences need a second, much slower TSV pass
+            if Config.NEED_WORD_CONF:
+                confidence = self._tesseract_confidence(processed_img)
+            else:
+                confidence = self.TESSERACT_DEFAULT_CONFIDENCE if full_text else 0.0
             
             return {
                 "text": full_text,
-                "confidence": avg_confidence / 100,  # Convert to 0-1 scale
+                "confidence": confidence,
                 "success": True
             }
             
         except Exception as e:
             return {"text": "", "confidence": 0.0, "success": False, "error": str(e)}
     
-    def process_with_multiple_engines(self, image_path: str) -> Dict[str, any]:
+    def _tesseract_confidence(self, processed_img: np.ndarray) -> float:
         """
-        Process image using multiple OCR engines with fallback strategy
+        Average Tesseract word confidence on a 0-1 scale
         """
-        results = []
+        data = pytesseract.image_to_data(processed_img, config=self.TESSERACT_CONFIG,
+                                         output_type=pytesseract.Output.DICT)
         
-        # Try Google Vision first
+        # Only include words with confidence > 0
+        confidences = [float(conf) for conf in data['conf'] if float(conf) > 0]
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return avg_confidence / 100  # Convert to 0-1 scale
+    
+    def _cloud_engines(self) -> List[Tuple[str, Callable[[bytes], Dict[str, any]]]]:
+        """
+        Configured cloud OCR engines, in order of preference
+        """
+        engines = []
         if self.google_vision_client:
-            result = self.google_vision_ocr(image_path)
-            result['engine'] = 'google_vision'
-            results.append(result)
-        
-        # Try AWS Textract if Google Vision fails or is not available
+            engines.append(('google_vision', self.google_vision_ocr))
         if self.aws_textract_client:
-            result = self.aws_textract_ocr(image_path)
-            result['engine'] = 'aws_textract'
-            results.append(result)
-        
-        # Always try Tesseract as fallback
-        result = self.tesseract_ocr(image_path)
+            engines.append(('aws_textract', self.aws_textract_ocr))
+        return engines
+    
+    def _needs_tesseract(self, results: List[Dict]) -> bool:
+        """
+        Tesseract, with its local preprocessing, only runs when no cloud engine
+        returned a usable result
+        """
+        return not any(
+            r['success'] and r['confidence'] >= Config.CLOUD_OCR_MIN_CONFIDENCE for r in results
+        )
+    
+    def _run_tesseract(self, image: OCRInput, preprocess: Optional[Preprocess] = None) -> Dict[str, any]:
+        if hasattr(image, 'seek'):
+            # The cloud engines may already have read the file
+            image.seek(0)
+        if preprocess is not None:
+            try:
+                image = preprocess(image)
+            except Exception as e:
+                return {"text": "", "confidence": 0.0, "success": False, "error": str(e), "engine": "tesseract"}
+        if isinstance(image, np.ndarray):
+            result = self.tesseract_ocr_from_array(image)
+        else:
+            result = self.tesseract_ocr(image)
         result['engine'] = 'tesseract'
-        results.append(result)
+        return result
+    
+    def process_with_multiple_engines(self, image: OCRInput, preprocess: Optional[Preprocess] = None) -> Dict[str, any]:
+        """
+        Process image using multiple OCR engines with fallback strategy. The cloud
+        engines run in parallel threads on the raw bytes, read once, and results
+        are collected as they complete; once one reaches OCR_EARLY_EXIT_CONFIDENCE
+        the rest are not waited for. Tesseract is the fallback when none of them
+        succeeds with CLOUD_OCR_MIN_CONFIDENCE.
+        
+        `image` is a file path, encoded image bytes or file object, or an array
+        already preprocessed for OCR, which Tesseract then reads without decoding
+        or preprocessing it again. `preprocess`, when given, replaces Tesseract's
+        own preprocessing; the cloud engines always get the original image.
+        """
+        results = []
         
-        # Select the best result based on confidence
+        cloud_engines = self._cloud_engines()
+        if cloud_engines:
+            image_bytes = self._read_image_bytes(image)
+            pool = ThreadPoolExecutor(max_workers=len(cloud_engines))
+            futures = {pool.submit(engine, image_bytes): name for name, engine in cloud_engines}
+            try:
+                for future in as_completed(futures):
+                    result = future.result()
+                    result['engine'] = futures[future]
+                    results.append(result)
+                    if result['success'] and result['confidence'] >= Config.OCR_EARLY_EXIT_CONFIDENCE:
+                        break
+            finally:
+                # Calls already in flight finish in the background; nothing waits on them
+                for future in futures:
+                    future.cancel()
+                pool.shutdown(wait=False)
+        
+        if self._needs_tesseract(results):
+            results.append(self._run_tesseract(image, preprocess))
+        
+        return self._select_best_result(results)
+    
+    def process_bytes(self, data: bytes) -> Dict[str, any]:
+        """
+        OCR an encoded image (JPEG, PNG, ...) held in memory. The cloud engines get
+        the bytes as they are and Tesseract decodes them in memory, so nothing is
+        written to or read from disk.
+        """
+        return self.process_with_multiple_engines(data)
+    
+    async def process_with_multiple_engines_async(self, image: OCRInput, executor: Optional[Executor] = None,
+                                                  preprocess: Optional[Preprocess] = None) -> Dict[str, any]:
+        """
+        Run the cloud OCR engines concurrently in a thread pool, so the wall-clock
+        time is that of the slowest engine rather than the sum. Stops waiting for
+        the others as soon as one result reaches OCR_EARLY_EXIT_CONFIDENCE, and
+        falls back to Tesseract only when no cloud result is good enough.
+        `image` is a file path, encoded image bytes or file object, or an already
+        preprocessed array; `preprocess` is as for process_with_multiple_engines.
+        """
+        loop = asyncio.get_running_loop()
+        results = []
+        
+        cloud_engines = self._cloud_engines()
+        if cloud_engines:
+            image_bytes = await loop.run_in_executor(executor, self._read_image_bytes, image)
+            
+            async def run_engine(engine_name: str, engine: Callable[[bytes], Dict[str, any]]) -> Dict[str, any]:
+                result = await loop.run_in_executor(executor, engine, image_bytes)
+                result['engine'] = engine_name
+                return result
+            
+            tasks = [asyncio.ensure_future(run_engine(name, engine)) for name, engine in cloud_engines]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    result = await next_result
+                    results.append(result)
+                    if result['success'] and result['confidence'] >= Config.OCR_EARLY_EXIT_CONFIDENCE:
+                        break
+            finally:
+                # Engines already running in a thread finish, but their results are not awaited
+                for task in tasks:
+                    task.cancel()
+        
+        if self._needs_tesseract(results):
+            results.append(await loop.run_in_executor(executor, self._run_tesseract, image, preprocess))
+        
+        return self._select_best_result(results)
+    
+    def _select_best_result(self, results: List[Dict]) -> Dict[str, any]:
+        """
+        Select the best result based on confidence
+        """
         successful_results = [r for r in results if r['success']]
         
         if not successful_results:
@@ -0,0 +1,126 @@
+"""
+Document processing pipeline shared by the API and the command-line engine
+"""
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Dict, Any, Optional, Union, BinaryIO, Callable, Awaitable
+
+from config.settings import Config
+
+ProgressCallback = Callable[[int, str], Awaitable[None]]
+
+
+async def _no_progress(progress: int, message: str) -> None:
+    pass
+
+
+async def run_pipeline(components, source: Union[str, BinaryIO], doc_id: str, filename: str,
+                       content_hash: Optional[str] = None, executor: Optional[Executor] = None,
+                       report_progress: ProgressCallback = _no_progress,
+                       metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run a document through preprocessing, OCR, field extraction, AI and rule-based
+    validation, and store the result.
+
+    `components` provides ocr_engine, preprocessor, field_extractor, ai_verifier,
+    rule_validator, storage_manager and optionally ocr_cache. `source` is a file
+    path or a file object such as BytesIO. Blocking stages run in `executor`.
+    """
+    start_time = datetime.now()
+    loop = asyncio.get_running_loop()
+
+    async def run_blocking(fn, *args):
+        return await loop.run_in_executor(executor, fn, *args)
+
+    # Reuse the OCR result of identical content seen by any worker, even across restarts
+    ocr_cache = getattr(components, 'ocr_cache', None)
+    ocr_result = await ocr_cache.get(content_hash) if ocr_cache and content_hash else None
+
+    if ocr_result is None:
+        await report_progress(10, "Starting OCR")
+
+        # The cloud engines get the original upload; the image is only preprocessed
+        # in memory when the Tesseract fallback runs, and goes to it without a temp file
+        ocr_result = await components.ocr_engine.process_with_multiple_engines_async(
+            source, executor, preprocess=components.preprocessor.preprocess_document_array
+        )
+
+        if not ocr_result["success"]:
+            raise Exception(f"OCR failed: {ocr_result.get('error', 'Unknown error')}")
+
+        if ocr_cache and content_hash:
+            await ocr_cache.put(content_hash, ocr_result)
+
+    await report_progress(60, "OCR complete, extracting fields")
+
+    # Extract structured fields
+    extracted_fields = await run_blocking(components.field_extractor.extract_fields, ocr_result["text"])
+
+    await report_progress(70, "Field extraction complete, validating with AI")
+
+    # Validate and correct with AI; the async client needs no worker thread
+    ai_result = await components.ai_verifier.validate_and_correct_async(extracted_fields, ocr_result["text"])
+
+    await report_progress(85, "AI validation complete, applying rule-based validation")
+
+    # Apply rule-based validation
+    rule_results = await run_blocking(components.rule_validator.validate_fields, ai_result["validated_data"])
+
+    # Calculate combined confidence score
+    combined_confidence = components.ai_verifier.calculate_combined_confidence(
+        ocr_result["confidence"],
+        ai_result["confidence_score"],
+        rule_results
+    )
+
+    await report_progress(95, "Finalizing results")
+
+    # Determine document status based on confidence
+    if combined_confidence >= Config.AUTO_APPROVE_THRESHOLD:
+        status = "auto_approved"
+    elif combined_confidence >= Config.AI_REVIEW_THRESHOLD:
+        status = "ai_review"
+    else:
+        status = "manual_review"
+
+    # Prepare document for storage
+    document_data = {
+        "_id": doc_id,
+        "original_filename": filename,
+        "document_type": extracted_fields.get("document_type", "unknown"),
+        "extracted_fields": ai_result["validated_data"],
+        "ocr_text": ocr_result["text"],
+        "ocr_engine_used": ocr_result["best_engine"],
+        "confidence": combined_confidence,
+        "status": status,
+        "ocr_confidence": ocr_result["confidence"],
+        "ai_confidence": ai_result["confidence_score"],
+        "rule_validation_results": rule_results,
+        "issues_detected": ai_result["issues_detected"],
+        "corrections_made": ai_result.get("corrections_made", {}),
+        "content_hash": content_hash,
+        "processing_metadata": {
+            **(metadata or {}),
+            "upload_time": start_time.isoformat(),
+            "processing_time": (datetime.now() - start_time).total_seconds()
+        }
+    }
+
+    # Save to storage. The MongoDB write is batched, so wait for it before the
+    # hash index points at the document and the caller reports it as completed
+    await run_blocking(components.storage_manager.save_document, document_data)
+    await run_blocking(components.storage_manager.flush_document, doc_id)
+    if content_hash:
+        await run_blocking(components.storage_manager.save_hash_index, content_hash, doc_id)
+
+    return {
+        "document_id": doc_id,
+        "status": status,
+        "extracted_fields": ai_result["validated_data"],
+        "confidence_score": combined_confidence,
+        "processing_time": (datetime.now() - start_time).total_seconds(),
+        "ocr_engine_used": ocr_result["best_engine"],
+        "issues_detected": ai_result["issues_detected"],
+        "corrections_made": ai_result.get("corrections_made", {})
+    }
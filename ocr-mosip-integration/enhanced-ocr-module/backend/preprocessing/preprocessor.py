@@ -2,8 +2,68 @@ import cv2
 import numpy as np
 from PIL import Image
 import io
-from typing import Union
+from typing import Union, BinaryIO, Optional, Tuple
 import os
+import uuid
+from config.settings import Config
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Make sure OpenCV dispatches to its SIMD-optimized kernels
+cv2.setUseOptimized(True)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True, nogil=True)
+    def _linear_transform_kernel(src, alpha, beta, dst):
+        """
+        Saturating dst = alpha * src + beta over flat uint8 arrays, in one pass
+        """
+        for i in prange(src.size):
+            value = alpha * src[i] + beta
+            if value < 0:
+                dst[i] = 0
+            elif value > 255:
+                dst[i] = 255
+            else:
+                dst[i] = np.uint8(value + 0.5)
+
+    # No fastmath: contracting the projection into a fused multiply-add would round
+    # differently from _projection_profile_scores_numpy and shift the estimate
+    @njit(parallel=True, cache=True, nogil=True)
+    def _projection_profile_scores(ys, xs, cos_a, sin_a):
+        """
+        Sum of squared row counts of the ink pixels projected at each angle. Angles
+        run in parallel and each builds only its own histogram.
+        """
+        scores = np.zeros(cos_a.size)
+        for a in prange(cos_a.size):
+            lowest = np.inf
+            highest = -np.inf
+            for i in range(ys.size):
+                p = cos_a[a] * ys[i] - sin_a[a] * xs[i]
+                lowest = min(lowest, p)
+                highest = max(highest, p)
+            
+            bins = np.zeros(int(round(highest - lowest)) + 1)
+            for i in range(ys.size):
+                bins[int(round(cos_a[a] * ys[i] - sin_a[a] * xs[i] - lowest))] += 1.0
+            scores[a] = np.sum(bins * bins)
+        return scores
+
+
+def _projection_profile_scores_numpy(ys, xs, cos_a, sin_a):
+    """
+    Same scores as the compiled kernel, projecting every ink pixel for all angles
+    at once. Each angle is offset by its own lowest value, as in the kernel.
+    """
+    projected = np.outer(cos_a, ys) - np.outer(sin_a, xs)
+    projected = np.rint(projected - projected.min(axis=1, keepdims=True)).astype(np.intp)
+    return np.array([np.square(np.bincount(row).astype(np.float64)).sum() for row in projected])
 
 
 class ImagePreprocessor:
@@ -11,22 +71,60 @@ class ImagePreprocessor:
     Image preprocessing module for OCR enhancement
     """
     
-    def __init__(self):
-        pass
+    NOISE_LEVELS = ('none', 'light', 'medium')
+    # Smaller skew angles are left alone; rotating would only blur the text
+    MIN_SKEW_CORRECTION_DEGREES = 0.5
     
-    def preprocess(self, image_path: str, output_path: str = None) -> str:
+    def __init__(self, noise_level: str = Config.DENOISE_LEVEL):
+        if noise_level not in self.NOISE_LEVELS:
+            raise ValueError(f"noise_level must be one of {', '.join(self.NOISE_LEVELS)}")
+        self.noise_level = noise_level
+        # Created once; building a CLAHE object per image is wasted work
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    
+    def _load_image(self, image_source: Union[str, BinaryIO]) -> Tuple[np.ndarray, float]:
         """
-        Complete preprocessing pipeline for OCR optimization
+        Load an image from a file path or decode it from an in-memory file object,
+        along with its resolution. Images are decoded straight to grayscale, as
+        every pipeline starts with it.
         """
-        # Load image
-        img = cv2.imread(image_path)
+        if isinstance(image_source, str):
+            return cv2.imread(image_source, cv2.IMREAD_GRAYSCALE), self._read_dpi(image_source)
         
-        # Apply preprocessing steps
-        processed_img = self._grayscale_conversion(img)
-        processed_img = self._noise_reduction(processed_img)
-        processed_img = self._skew_correction(processed_img)
-        processed_img = self._contrast_normalization(processed_img)
-        processed_img = self._resize_to_optimal_dpi(processed_img)
+        data = image_source.read()
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        return img, self._read_dpi(io.BytesIO(data))
+    
+    def _read_dpi(self, image_source: Union[str, BinaryIO]) -> float:
+        """
+        Read the horizontal resolution from the image metadata. Only the header is
+        parsed; images without a usable DPI get Config.DEFAULT_IMAGE_DPI.
+        """
+        try:
+            with Image.open(image_source) as image:
+                dpi = image.info.get('dpi')
+        except (OSError, ValueError):
+            dpi = None
+        
+        if dpi and float(dpi[0]) > 1:
+            return float(dpi[0])
+        return Config.DEFAULT_IMAGE_DPI
+    
+    def _temp_output_name(self, image_source: Union[str, BinaryIO]) -> str:
+        """
+        Base name for the temporary processed image
+        """
+        if isinstance(image_source, str):
+            return os.path.basename(image_source)
+        return f"{uuid.uuid4().hex}.png"
+    
+    def preprocess(self, image_path: Union[str, BinaryIO], output_path: str = None) -> str:
+        """
+        Complete preprocessing pipeline for OCR optimization
+        """
+        # Load image and apply preprocessing steps
+        img, dpi = self._load_image(image_path)
+        processed_img = self.preprocess_array(img, dpi)
         
         # Save processed image
         if output_path:
@@ -34,10 +132,32 @@ class ImagePreprocessor:
             return output_path
         else:
             # Create a temporary file
-            temp_path = f"temp_processed_{os.path.basename(image_path)}"
+            temp_path = f"temp_processed_{self._temp_output_name(image_path)}"
             cv2.imwrite(temp_path, processed_img)
             return temp_path
     
+    def preprocess_array(self, img: np.ndarray, dpi: float = Config.DEFAULT_IMAGE_DPI,
+                         binarize: bool = True) -> np.ndarray:
+        """
+        Run the preprocessing steps on a decoded image of the given resolution.
+        Images above the target DPI are shrunk first so the filters see fewer
+        pixels; upscaling runs once at the end. Steps that can work in place reuse
+        the previous buffer, so `img` may be modified.
+        
+        By default the result is an Otsu-binarized page, which Tesseract reads
+        faster and more accurately than an equalized one. Pass binarize=False to
+        keep a contrast-normalized grayscale image instead.
+        """
+        img = self._grayscale_conversion(img)
+        img, dpi = self._shrink_to_optimal_dpi(img, dpi)
+        img = self._noise_reduction(img)
+        img = self._skew_correction(img)
+        if binarize:
+            self._binarize(img, dst=img)
+        else:
+            self._contrast_normalization(img, dst=img)
+        return self._resize_to_optimal_dpi(img, dpi)
+    
     def _grayscale_conversion(self, img: np.ndarray) -> np.ndarray:
         """
         Convert image to grayscale
@@ -50,23 +170,35 @@ class ImagePreprocessor:
     
     def _noise_reduction(self, img: np.ndarray) -> np.ndarray:
         """
-        Apply noise reduction using non-local means denoising
+        Apply edge-preserving noise reduction. Non-local means denoising cost many
+        times more for no visible gain on scanned text.
         """
-        # Apply fast non-local means denoising
-        denoised = cv2.fastNlMeansDenoising(img)
-        return denoised
+        if self.noise_level == 'none':
+            return img
+        if self.noise_level == 'light':
+            return cv2.medianBlur(img, 3)
+        return cv2.bilateralFilter(img, 5, 50, 50)
     
     def _skew_correction(self, img: np.ndarray) -> np.ndarray:
         """
-        Correct image skew using contour detection
+        Correct image skew from the dominant angle of the Hough lines in the edge map
         """
-        coords = np.column_stack(np.where(img > 0))
-        angle = cv2.minAreaRect(coords)[-1]
+        edges = cv2.Canny(img, 50, 150)
+        lines = cv2.HoughLines(edges, 1, np.pi / 720, 200)
+        if lines is None:
+            return img
         
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
+        # A text baseline at angle a has its normal at 90 + a degrees; only
+        # near-horizontal lines follow the baselines
+        angles = np.degrees(lines[:, 0, 1]) - 90
+        angles = angles[np.abs(angles) < 45]
+        if angles.size == 0:
+            return img
+        angle = float(np.median(angles))
+        
+        # Skip the full-frame cubic warp for well-scanned pages
+        if abs(angle) < self.MIN_SKEW_CORRECTION_DEGREES:
+            return img
             
         (h, w) = img.shape[:2]
         center = (w // 2, h // 2)
@@ -75,30 +207,56 @@ class ImagePreprocessor:
         
         return rotated
     
-    def _contrast_normalization(self, img: np.ndarray) -> np.ndarray:
+    def _contrast_normalization(self, img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Normalize image contrast using histogram equalization
+        Normalize image contrast using adaptive histogram equalization (CLAHE).
+        Global equalization amplifies background noise on documents. Pass dst=img
+        to equalize in place.
         """
-        # Apply histogram equalization
-        normalized = cv2.equalizeHist(img)
-        return normalized
+        return self._clahe.apply(img, dst=dst)
     
-    def _resize_to_optimal_dpi(self, img: np.ndarray, target_dpi: int = 300) -> np.ndarray:
+    def _binarize(self, img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Resize image to optimal DPI (default 300 DPI for OCR)
+        Binarize the image with a global Otsu threshold. Pass dst=img to threshold
+        in place.
         """
-        # Calculate current DPI based on image dimensions and physical size
-        # For now, we'll assume standard screen DPI (72) and scale to target DPI
-        height, width = img.shape
-        scale_factor = target_dpi / 72  # Assuming original was 72 DPI
+        _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=dst)
+        return binary
+    
+    def _enhance_document_text(self, img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Enhance text in document images using adaptive thresholding
+        """
+        # Apply adaptive threshold to enhance text
+        return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2, dst=dst)
+    
+    def _resize_to_optimal_dpi(self, img: np.ndarray, current_dpi: float = Config.DEFAULT_IMAGE_DPI,
+                               target_dpi: int = 300) -> np.ndarray:
+        """
+        Resize image from its actual resolution to the optimal DPI (default 300 DPI
+        for OCR). Images already within 10% of the target are returned unchanged.
+        """
+        scale_factor = target_dpi / current_dpi
+        if 0.9 < scale_factor < 1.1:
+            return img
         
+        height, width = img.shape
         new_width = int(width * scale_factor)
         new_height = int(height * scale_factor)
         
-        # Resize image using cubic interpolation for better quality
-        resized = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-        
-        return resized
+        # Cubic interpolation for better quality when enlarging, area averaging when shrinking
+        interpolation = cv2.INTER_CUBIC if scale_factor > 1 else cv2.INTER_AREA
+        return cv2.resize(img, (new_width, new_height), interpolation=interpolation)
+    
+    def _shrink_to_optimal_dpi(self, img: np.ndarray, current_dpi: float,
+                               target_dpi: int = 300) -> Tuple[np.ndarray, float]:
+        """
+        Downscale an image above the target resolution; returns the image and its
+        resulting DPI. Images at or below the target are left for the final resize.
+        """
+        if current_dpi <= target_dpi:
+            return img, current_dpi
+        return self._resize_to_optimal_dpi(img, current_dpi, target_dpi), target_dpi
     
     def enhance_text_regions(self, img: np.ndarray) -> np.ndarray:
         """
@@ -115,8 +273,13 @@ class ImagePreprocessor:
     
     def adjust_brightness_contrast(self, img: np.ndarray, brightness: int = 0, contrast: int = 0) -> np.ndarray:
         """
-        Adjust brightness and contrast of the image
+        Adjust brightness and contrast of the image. Both adjustments are linear,
+        so they are folded into a single pass over the pixels.
         """
+        if brightness == 0 and contrast == 0:
+            return img
+        
+        alpha_b, gamma_b = 1.0, 0.0
         if brightness != 0:
             if brightness > 0:
                 shadow = brightness
@@ -126,17 +289,24 @@ class ImagePreprocessor:
                 highlight = 255 + brightness
             alpha_b = (highlight - shadow) / 255
             gamma_b = shadow
-            
-            img = cv2.addWeighted(img, alpha_b, img, 0, gamma_b)
         
+        alpha_c, gamma_c = 1.0, 0.0
         if contrast != 0:
             f = 131 * (contrast + 127) / (127 * (131 - contrast))
             alpha_c = f
             gamma_c = 127 * (1 - f)
-            
-            img = cv2.addWeighted(img, alpha_c, img, 0, gamma_c)
         
-        return img
+        # contrast(brightness(x)) = alpha_c * (alpha_b * x + gamma_b) + gamma_c
+        alpha = alpha_c * alpha_b
+        beta = alpha_c * gamma_b + gamma_c
+        
+        if NUMBA_AVAILABLE and img.dtype == np.uint8:
+            src = np.ascontiguousarray(img)
+            out = np.empty_like(src)
+            _linear_transform_kernel(src.reshape(-1), alpha, beta, out.reshape(-1))
+            return out
+        
+        return cv2.addWeighted(img, alpha, img, 0, beta)
 
 
 class DocumentPreprocessor(ImagePreprocessor):
@@ -144,53 +314,86 @@ class DocumentPreprocessor(ImagePreprocessor):
     Specialized preprocessor for document images
     """
     
-    def __init__(self):
-        super().__init__()
+    # Quality gate: pages within these bounds are sent to OCR as they are
+    CLEAN_INK_DENSITY_RANGE = (0.02, 0.3)
+    CLEAN_MAX_SKEW_DEGREES = 0.5
+    QUALITY_GATE_MAX_SIDE = 600
+    
+    def __init__(self, noise_level: str = Config.DENOISE_LEVEL):
+        super().__init__(noise_level)
     
-    def preprocess_document(self, image_path: str, output_path: str = None) -> str:
+    def preprocess_document(self, image_path: Union[str, BinaryIO], output_path: str = None,
+                            skip_if_clean: bool = True) -> str:
         """
         Preprocess document-specific image with additional document optimizations
+        and save it. Accepts a file path or an in-memory file object such as BytesIO.
         """
-        img = cv2.imread(image_path)
-        
-        # Apply base preprocessing
-        processed_img = self._grayscale_conversion(img)
-        processed_img = self._noise_reduction(processed_img)
-        processed_img = self._skew_correction(processed_img)
-        processed_img = self._contrast_normalization(processed_img)
-        
-        # Document-specific enhancements
-        processed_img = self._enhance_document_text(processed_img)
-        processed_img = self._remove_document_background(processed_img)
-        processed_img = self._resize_to_optimal_dpi(processed_img)
+        processed_img = self.preprocess_document_array(image_path, skip_if_clean)
         
         # Save processed image
         if output_path:
             cv2.imwrite(output_path, processed_img)
             return output_path
         else:
-            temp_path = f"temp_doc_processed_{os.path.basename(image_path)}"
+            temp_path = f"temp_doc_processed_{self._temp_output_name(image_path)}"
             cv2.imwrite(temp_path, processed_img)
             return temp_path
     
-    def _enhance_document_text(self, img: np.ndarray) -> np.ndarray:
+    def preprocess_document_array(self, image_path: Union[str, BinaryIO], skip_if_clean: bool = True) -> np.ndarray:
         """
-        Enhance text in document images using adaptive thresholding
+        Preprocess a document image and return the result in memory, for callers
+        that pass it straight to OCR. Images that already pass the quality gate are
+        only converted to grayscale.
         """
-        # Apply adaptive threshold to enhance text
-        thresh = cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-        return thresh
+        img, dpi = self._load_image(image_path)
+        processed_img = self._grayscale_conversion(img)
+        
+        if not (skip_if_clean and self.is_clean_document(processed_img)):
+            # Apply base preprocessing, shrinking oversized scans first
+            processed_img, dpi = self._shrink_to_optimal_dpi(processed_img, dpi)
+            processed_img = self._noise_reduction(processed_img)
+            processed_img = self._skew_correction(processed_img)
+            self._contrast_normalization(processed_img, dst=processed_img)
+            
+            # Document-specific enhancements, thresholding in place
+            self._enhance_document_text(processed_img, dst=processed_img)
+            processed_img = self._resize_to_optimal_dpi(processed_img, dpi)
+        
+        return processed_img
     
-    def _remove_document_background(self, img: np.ndarray) -> np.ndarray:
+    def is_clean_document(self, img: np.ndarray) -> bool:
         """
-        Remove document background to improve OCR accuracy
+        Fast quality gate on a downsampled grayscale page: the Otsu ink density has
+        to look like printed text and the projection-profile skew has to be negligible
         """
-        # Apply morphological operations to clean background
-        kernel = np.ones((1, 1), np.uint8)
-        img = cv2.dilate(img, kernel, iterations=1)
-        img = cv2.erode(img, kernel, iterations=1)
+        scale = self.QUALITY_GATE_MAX_SIDE / max(img.shape[:2])
+        if scale < 1:
+            img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
-        return img
+        _, binary = cv2.threshold(img, 0, 1, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        density = cv2.countNonZero(binary) / binary.size
+        min_density, max_density = self.CLEAN_INK_DENSITY_RANGE
+        if not min_density <= density <= max_density:
+            return False
+        
+        return abs(self._estimate_skew_angle(binary)) < self.CLEAN_MAX_SKEW_DEGREES
+    
+    def _estimate_skew_angle(self, binary: np.ndarray, max_angle: float = 5.0, steps: int = 101) -> float:
+        """
+        Estimate page skew in degrees from the projection profile of the ink pixels.
+        Text lines give the sharpest row histogram when projected at the skew angle.
+        """
+        ys, xs = np.nonzero(binary)
+        if len(ys) == 0:
+            return 0.0
+        
+        angles = np.linspace(-max_angle, max_angle, steps)
+        radians = np.deg2rad(angles)
+        
+        # The compiled kernel never materializes the (angles x pixels) projection matrix
+        scores_fn = _projection_profile_scores if NUMBA_AVAILABLE else _projection_profile_scores_numpy
+        scores = scores_fn(ys.astype(np.float64), xs.astype(np.float64), np.cos(radians), np.sin(radians))
+        return float(angles[int(np.argmax(scores))])
 
 
 # Example usage
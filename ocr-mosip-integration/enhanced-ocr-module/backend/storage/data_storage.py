@@ -1,13 +1,165 @@
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+from pymongo import MongoClient, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError, BulkWriteError
+from pymongo.write_concern import WriteConcern
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any, List, Optional
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 from config.settings import Config
-import json
-import uuid
-from datetime import datetime
+import orjson
+from uuid6 import uuid7
+from datetime import datetime, date
 import hashlib
+import atexit
+import functools
+import threading
+import time
+
+# MongoDB error code for an insert whose _id already exists
+_DUPLICATE_KEY_ERROR = 11000
+
+
+class _BufferedWriter:
+    """
+    Collects documents for a MongoDB collection and writes them with one
+    insert_many once batch_size documents are waiting or flush_interval seconds
+    after the first one arrived, whichever comes first. Documents from a failed
+    write are queued again and retried every retry_interval seconds; after
+    max_attempts failed writes they are dropped and counted in failed_count.
+    """
+    
+    def __init__(self, collection, batch_size: int, flush_interval: float,
+                 retry_interval: float = Config.SAVE_RETRY_INTERVAL,
+                 max_attempts: int = Config.SAVE_WRITE_ATTEMPTS):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+        # Documents dropped after max_attempts failed writes
+        self.failed_count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        # Failed write attempts per queued document, keyed by id() of the dict
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Held while a batch is written, so flush_if_pending can wait for one in flight
+        self._write_lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        # Do not lose buffered writes on a clean shutdown
+        atexit.register(self.flush)
+    
+    def add(self, document: Dict[str, Any]):
+        """
+        Queue a document for the next batch
+        """
+        with self._lock:
+            self._buffer.append(document)
+            if len(self._buffer) >= self.batch_size:
+                batch = self._take_batch()
+            else:
+                batch = None
+                self._schedule(self.flush_interval)
+        
+        if batch:
+            self._write(batch)
+    
+    def flush(self):
+        """
+        Write everything buffered so far
+        """
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._write(batch)
+    
+    def flush_if_pending(self, doc_id: str):
+        """
+        Write the buffer if it holds the document with this _id, so a read that
+        follows a save sees the document. This only covers saves made by this
+        process: other workers can miss a document for up to flush_interval.
+        Raises if the document could not be written.
+        """
+        # A batch already being written may hold the document, or fail and queue it again
+        with self._write_lock:
+            with self._lock:
+                if not any(document.get('_id') == doc_id for document in self._buffer):
+                    return
+                batch = self._take_batch()
+            failed, error = self._write(batch)
+        if any(document.get('_id') == doc_id for document in failed):
+            raise Exception(f"MongoDB error: {str(error)}")
+    
+    def _schedule(self, delay: float):
+        # Called with the lock held
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        # Called with the lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._buffer = self._buffer, []
+        return batch
+    
+    def _write(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[PyMongoError]]:
+        """
+        Insert a batch, queueing whatever was not written for another attempt.
+        Returns the documents that were not written and the error.
+        """
+        with self._write_lock:
+            try:
+                self.collection.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # Duplicate keys mean the document was written by an earlier attempt
+                failed = sorted({error['index'] for error in e.details.get('writeErrors', [])
+                                 if error.get('code') != _DUPLICATE_KEY_ERROR})
+                failed = [batch[i] for i in failed]
+                self._retry(failed, batch, e)
+                return failed, e
+            except PyMongoError as e:
+                self._retry(batch, batch, e)
+                return batch, e
+            
+            self._retry([], batch, None)
+            return [], None
+    
+    def _retry(self, failed: List[Dict[str, Any]], batch: List[Dict[str, Any]], error: Optional[PyMongoError]):
+        """
+        Put failed documents back at the front of the buffer, dropping those that
+        have used up their attempts
+        """
+        failed_ids = {id(document) for document in failed}
+        retry = []
+        dropped = 0
+        with self._lock:
+            for document in batch:
+                key = id(document)
+                if key not in failed_ids:
+                    self._attempts.pop(key, None)
+                    continue
+                attempts = self._attempts.get(key, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(key, None)
+                    dropped += 1
+                else:
+                    self._attempts[key] = attempts
+                    retry.append(document)
+            
+            self.failed_count += dropped
+            if retry:
+                self._buffer[:0] = retry
+                self._schedule(self.retry_interval)
+        
+        if retry:
+            print(f"Warning: MongoDB batch write failed, retrying {len(retry)} documents: {str(error)}")
+        if dropped:
+            print(f"Error: MongoDB batch write failed {self.max_attempts} times, "
+                  f"dropped {dropped} documents: {str(error)}")
 
 
 class MongoStorage:
@@ -16,23 +168,74 @@ class MongoStorage:
     """
     
     def __init__(self):
-        self.client = MongoClient(Config.MONGODB_URI)
+        # Pool sized for the worker threads; compression shrinks the large
+        # extracted_fields and OCR text payloads on the wire
+        self.client = MongoClient(
+            Config.MONGODB_URI,
+            maxPoolSize=Config.MONGO_POOL_MAX,
+            minPoolSize=Config.MONGO_POOL_MIN,
+            compressors=Config.MONGO_COMPRESSORS
+        )
         self.db = self.client.ocr_db  # Use a specific database name
-        self.collection = self.db.ocr_documents
+        # Primary acknowledgement is enough; don't wait for replication on every save
+        self.collection = self.db.get_collection('ocr_documents', write_concern=WriteConcern(w=1))
+        self.hash_index = self.db.ocr_hash_index
+        self._create_indexes()
+        
+        # Saves are batched into one insert_many per SAVE_BATCH_SIZE documents or
+        # SAVE_FLUSH_INTERVAL seconds
+        self._document_writer = _BufferedWriter(
+            self.collection, Config.SAVE_BATCH_SIZE, Config.SAVE_FLUSH_INTERVAL
+        )
+        
+        # The audit log does not need acknowledged writes; steps are buffered and
+        # sent in batches
+        self.processing_log = self.db.get_collection(
+            'ocr_processing_log', write_concern=WriteConcern(w=0, j=False)
+        )
+        self._log_writer = _BufferedWriter(
+            self.processing_log, Config.LOG_BATCH_SIZE, Config.LOG_FLUSH_INTERVAL
+        )
+    
+    def _create_indexes(self):
+        """
+        Declare the indexes the dashboard and search queries rely on. Equality
+        keys come before the sort key, following the ESR rule.
+        """
+        try:
+            self.collection.create_index(
+                [('document_type', ASCENDING), ('status', ASCENDING), ('created_at', DESCENDING)],
+                name='type_status_created'
+            )
+        except PyMongoError as e:
+            print(f"Warning: MongoDB index creation failed: {str(e)}")
     
     def save_document(self, document_data: Dict[str, Any]) -> str:
         """
-        Save document data to MongoDB
+        Queue document data for the next batched write to MongoDB. The ID is
+        known up front, so it is returned without waiting for the write.
+        """
+        # Keep the caller's document ID so lookups by it find the document;
+        # generate one only if none was given
+        document_data.setdefault('_id', uuid7().hex)
+        document_data['created_at'] = document_data['updated_at'] = datetime.utcnow()
+        
+        self._document_writer.add(document_data)
+        return str(document_data['_id'])
+    
+    def save_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save many documents to MongoDB in one unordered insert_many
         """
         try:
-            # Add timestamp and ID
-            doc_id = str(uuid.uuid4())
-            document_data['_id'] = doc_id
-            document_data['created_at'] = datetime.utcnow()
-            document_data['updated_at'] = datetime.utcnow()
+            now = datetime.utcnow()
+            for document_data in documents:
+                document_data.setdefault('_id', uuid7().hex)
+                document_data['created_at'] = now
+                document_data['updated_at'] = now
             
-            result = self.collection.insert_one(document_data)
-            return str(result.inserted_id)
+            result = self.collection.insert_many(documents, ordered=False)
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
         except PyMongoError as e:
             raise Exception(f"MongoDB error: {str(e)}")
     
@@ -40,6 +243,7 @@ class MongoStorage:
         """
         Retrieve document by ID from MongoDB
         """
+        self._document_writer.flush_if_pending(doc_id)
         try:
             document = self.collection.find_one({'_id': doc_id})
             return document
@@ -50,6 +254,7 @@ class MongoStorage:
         """
         Update document in MongoDB
         """
+        self._document_writer.flush_if_pending(doc_id)
         try:
             update_data['updated_at'] = datetime.utcnow()
             result = self.collection.update_one(
@@ -60,31 +265,269 @@ class MongoStorage:
         except PyMongoError as e:
             raise Exception(f"MongoDB error: {str(e)}")
     
-    def search_documents(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def get_and_update_status(self, doc_id: str, corrections: Dict[str, Any],
+                              status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Apply field corrections and an optional new status, returning the updated
+        document in the same round trip
+        """
+        self._document_writer.flush_if_pending(doc_id)
+        try:
+            update_data = {f'extracted_fields.{field}': value for field, value in corrections.items()}
+            if status:
+                update_data['status'] = status
+            update_data['updated_at'] = datetime.utcnow()
+            
+            return self.collection.find_one_and_update(
+                {'_id': doc_id},
+                {'$set': update_data},
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            raise Exception(f"MongoDB error: {str(e)}")
+    
+    def get_by_hash(self, content_hash: str) -> Optional[str]:
+        """
+        Look up the document ID previously stored for a file content hash
+        """
+        try:
+            entry = self.hash_index.find_one({'_id': content_hash})
+            return entry['document_id'] if entry else None
+        except PyMongoError as e:
+            raise Exception(f"MongoDB error: {str(e)}")
+    
+    def save_hash_index(self, content_hash: str, doc_id: str) -> None:
+        """
+        Map a file content hash to the document processed from it
+        """
+        try:
+            self.hash_index.update_one(
+                {'_id': content_hash},
+                {'$set': {'document_id': doc_id, 'created_at': datetime.utcnow()}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            raise Exception(f"MongoDB error: {str(e)}")
+    
+    def log_processing_step(self, document_id: str, step: str, status: str, error_message: str = None):
+        """
+        Buffer a processing step for the audit trail
+        """
+        self._log_writer.add({
+            'document_id': document_id,
+            'processing_step': step,
+            'status': status,
+            'error_message': error_message,
+            'created_at': datetime.utcnow()
+        })
+    
+    def flush_processing_log(self):
+        """
+        Write buffered processing steps now
+        """
+        self._log_writer.flush()
+    
+    @property
+    def failed_document_writes(self) -> int:
+        """
+        Documents this process dropped after all batched write attempts failed
+        """
+        return self._document_writer.failed_count
+    
+    def flush_documents(self):
+        """
+        Write buffered document saves now
+        """
+        self._document_writer.flush()
+    
+    def flush_document(self, doc_id: str):
         """
-        Search documents in MongoDB
+        Write the buffered save of this document now, raising if it fails
         """
+        self._document_writer.flush_if_pending(doc_id)
+    
+    def search_documents(self, query: Dict[str, Any], limit: Optional[int] = None,
+                         offset: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Search documents in MongoDB. Returns a cursor that fetches results in
+        batches as it is iterated; paging is applied by the server.
+        """
+        self._document_writer.flush()
         try:
-            cursor = self.collection.find(query)
-            return list(cursor)
+            cursor = self.collection.find(query).skip(offset).batch_size(Config.SEARCH_BATCH_SIZE)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+            return cursor
         except PyMongoError as e:
             raise Exception(f"MongoDB error: {str(e)}")
 
 
+# Search filters PostgreSQL accepts, in the order their conditions are emitted
+_SEARCH_CONDITIONS = {
+    'name': "name ILIKE %s",
+    'id_number': "id_number ILIKE %s",
+    'address': "address ILIKE %s",
+    'document_type': "document_type ILIKE %s",
+    'status': "status ILIKE %s",
+    'confidence_min': "confidence >= %s",
+    'confidence_max': "confidence <= %s",
+}
+_SUBSTRING_FILTERS = frozenset(('name', 'id_number', 'address', 'document_type', 'status'))
+
+
+@functools.lru_cache(maxsize=128)
+def _search_sql(keys: tuple) -> str:
+    """
+    Search query for a combination of filter keys. The shape is built once per
+    combination; LIMIT and OFFSET are always parameters (LIMIT NULL means no limit).
+    """
+    query = "SELECT * FROM ocr_results"
+    if keys:
+        query += " WHERE " + " AND ".join(_SEARCH_CONDITIONS[key] for key in keys)
+    return query + " ORDER BY created_at DESC LIMIT %s OFFSET %s"
+
+
+class StorageUnavailableError(Exception):
+    """
+    Raised when a database cannot be reached after retrying
+    """
+
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """
+    Pooled connection that remembers whether the hot statements are prepared on it
+    """
+    statements_prepared = False
+
+
 class PostgreSQLStorage:
     """
     PostgreSQL storage for structured reporting
     """
     
+    # Hot queries, prepared once per connection so the server skips parse and
+    # plan on every call
+    PREPARED_STATEMENTS = {
+        'save_ocr': """
+            PREPARE save_ocr (varchar, varchar, date, varchar, text, varchar, numeric, varchar, jsonb) AS
+            INSERT INTO ocr_results
+            (document_id, name, dob, id_number, address, document_type, confidence, status, extracted_fields)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+            ON CONFLICT (document_id)
+            DO UPDATE SET
+                name = EXCLUDED.name,
+                dob = EXCLUDED.dob,
+                id_number = EXCLUDED.id_number,
+                address = EXCLUDED.address,
+                document_type = EXCLUDED.document_type,
+                confidence = EXCLUDED.confidence,
+                status = EXCLUDED.status,
+                extracted_fields = EXCLUDED.extracted_fields,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        """,
+        'get_ocr': """
+            PREPARE get_ocr (varchar) AS
+            SELECT * FROM ocr_results WHERE document_id = $1
+        """,
+        'upd_status': """
+            PREPARE upd_status (varchar, varchar) AS
+            UPDATE ocr_results SET status = $1, updated_at = CURRENT_TIMESTAMP WHERE document_id = $2
+        """,
+        'log_step': """
+            PREPARE log_step (varchar, varchar, varchar, text) AS
+            INSERT INTO ocr_processing_log (document_id, processing_step, status, error_message)
+            VALUES ($1, $2, $3, $4)
+        """,
+    }
+    
     def __init__(self):
+        # The pool is opened on first use, so startup does not wait on the
+        # database and an outage at startup is not permanent
+        self.pool = None
+        self._pool_lock = threading.RLock()
+        # POSTGRES_ENABLED=false (or an empty POSTGRES_URI) runs with MongoDB
+        # only; otherwise PostgreSQL is required and outages surface as
+        # StorageUnavailableError
+        self.connection_available = Config.POSTGRES_ENABLED and bool(Config.POSTGRES_URI)
+    
+    def _open_pool(self):
+        """
+        Open the connection pool and create the tables, once
+        """
+        with self._pool_lock:
+            if self.pool is not None:
+                return
+            
+            # Worker threads each check out their own connection instead of sharing one
+            self.pool = ThreadedConnectionPool(
+                Config.POSTGRES_POOL_MIN,
+                Config.POSTGRES_POOL_MAX,
+                Config.POSTGRES_URI,
+                connection_factory=_PooledConnection
+            )
+            try:
+                self.create_tables()
+            except Exception:
+                self.pool.closeall()
+                self.pool = None
+                raise
+    
+    def _checkout(self) -> _PooledConnection:
+        """
+        Get a live connection from the pool, retrying with exponential backoff
+        while the server is unreachable or the pool is exhausted. Any database
+        error while setting up the pool is reported as StorageUnavailableError.
+        """
+        last_error = None
+        for attempt in range(Config.POSTGRES_CONNECT_RETRIES):
+            if attempt:
+                time.sleep(Config.POSTGRES_RETRY_BACKOFF * 2 ** (attempt - 1))
+            try:
+                self._open_pool()
+                conn = self.pool.getconn()
+            except (psycopg2.OperationalError, PoolError) as e:
+                last_error = e
+                continue
+            except psycopg2.Error as e:
+                raise StorageUnavailableError(f"PostgreSQL unavailable: {str(e)}") from e
+            
+            if not conn.closed:
+                return conn
+            # Dropped by the server since it was pooled
+            self.pool.putconn(conn, close=True)
+        
+        raise StorageUnavailableError(f"PostgreSQL unavailable: {str(last_error)}")
+    
+    @contextmanager
+    def _connection(self, prepare: bool = True):
+        """
+        Check out a pooled connection for the duration of the block. The
+        transaction is rolled back if the block raises, and the connection always
+        goes back to the pool.
+        """
+        conn = self._checkout()
         try:
-            self.conn = psycopg2.connect(Config.POSTGRES_URI)
-            self.connection_available = True
-        except psycopg2.Error as e:
-            print(f"Warning: PostgreSQL connection failed: {str(e)}")
-            print("PostgreSQL storage will be unavailable, using MongoDB only")
-            self.connection_available = False
-            self.conn = None
+            if prepare and not conn.statements_prepared:
+                self._prepare_statements(conn)
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn, close=bool(conn.closed))
+    
+    def _prepare_statements(self, conn: _PooledConnection):
+        """
+        Prepare the hot queries on a connection. Prepared statements belong to a
+        session, so this runs once per pooled connection, after the tables exist.
+        """
+        with conn.cursor() as cur:
+            for statement in self.PREPARED_STATEMENTS.values():
+                cur.execute(statement)
+        conn.commit()
+        conn.statements_prepared = True
     
     def create_tables(self):
         """
@@ -110,6 +553,9 @@ class PostgreSQLStorage:
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         
+        CREATE INDEX IF NOT EXISTS ocr_results_type_status_created
+            ON ocr_results (document_type, status, created_at DESC);
+        
         CREATE TABLE IF NOT EXISTS ocr_processing_log (
             id SERIAL PRIMARY KEY,
             document_id VARCHAR(255),
@@ -121,12 +567,37 @@ class PostgreSQLStorage:
         """
         
         try:
-            with self.conn.cursor() as cur:
+            with self._connection(prepare=False) as conn, conn.cursor() as cur:
                 cur.execute(create_table_query)
-                self.conn.commit()
+                conn.commit()
         except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Error creating tables: {str(e)}")
+            raise StorageUnavailableError(f"Error creating tables: {str(e)}") from e
+        
+        self._create_search_indexes()
+    
+    def _create_search_indexes(self):
+        """
+        Trigram indexes so the substring (ILIKE '%...%') search filters don't
+        scan the whole table. pg_trgm may need privileges the application role
+        lacks, so failure only costs search speed.
+        """
+        search_index_query = """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        
+        CREATE INDEX IF NOT EXISTS ocr_results_name_trgm
+            ON ocr_results USING gin (name gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS ocr_results_id_number_trgm
+            ON ocr_results USING gin (id_number gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS ocr_results_address_trgm
+            ON ocr_results USING gin (address gin_trgm_ops);
+        """
+        
+        try:
+            with self._connection(prepare=False) as conn, conn.cursor() as cur:
+                cur.execute(search_index_query)
+                conn.commit()
+        except psycopg2.Error as e:
+            print(f"Warning: PostgreSQL trigram index creation failed: {str(e)}")
     
     def save_document(self, document_data: Dict[str, Any]) -> int:
         """
@@ -136,65 +607,92 @@ class PostgreSQLStorage:
             print("PostgreSQL not available, skipping save")
             return -1  # Return -1 to indicate failure
             
+        # Extract fields for individual columns before taking a connection
+        params = self._document_row(document_data)
+        
         try:
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Extract fields for individual columns
-                name = document_data.get('extracted_fields', {}).get('name', '')
-                dob = document_data.get('extracted_fields', {}).get('dob', None)
-                id_number = document_data.get('extracted_fields', {}).get('id_number', '')
-                address = document_data.get('extracted_fields', {}).get('address', '')
-                doc_type = document_data.get('extracted_fields', {}).get('document_type', '')
-                confidence = document_data.get('confidence', 0.0)
-                status = document_data.get('status', 'processed')
-                
-                # Convert date string to date object if needed
-                if isinstance(dob, str):
-                    from datetime import datetime
-                    try:
-                        dob = datetime.strptime(dob, '%Y-%m-%d').date()
-                    except ValueError:
-                        dob = None
-                
-                # Insert the record
-                insert_query = """
-                INSERT INTO ocr_results 
-                (document_id, name, dob, id_number, address, document_type, confidence, status, extracted_fields)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (document_id) 
-                DO UPDATE SET
-                    name = EXCLUDED.name,
-                    dob = EXCLUDED.dob,
-                    id_number = EXCLUDED.id_number,
-                    address = EXCLUDED.address,
-                    document_type = EXCLUDED.document_type,
-                    confidence = EXCLUDED.confidence,
-                    status = EXCLUDED.status,
-                    extracted_fields = EXCLUDED.extracted_fields,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING id;
-                """
-                
-                cur.execute(insert_query, (
-                    document_data.get('_id', str(uuid.uuid4())),
-                    name,
-                    dob,
-                    id_number,
-                    address,
-                    doc_type,
-                    confidence,
-                    status,
-                    json.dumps(document_data.get('extracted_fields', {}))
-                ))
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # Insert or update the record
+                cur.execute("EXECUTE save_ocr (%s, %s, %s, %s, %s, %s, %s, %s, %s)", params)
                 
                 result = cur.fetchone()
-                self.conn.commit()
+                conn.commit()
                 
                 return result['id']
                 
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"PostgreSQL error: {str(e)}")
     
+    def save_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[int]:
+        """
+        Save many documents to PostgreSQL with multi-row upserts, one round trip
+        per BULK_INSERT_PAGE_SIZE documents and a single commit
+        """
+        if not self.connection_available:
+            print("PostgreSQL not available, skipping save")
+            return []
+        
+        rows = [self._document_row(document_data) for document_data in documents]
+        
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                results = execute_values(
+                    cur,
+                    """
+                    INSERT INTO ocr_results
+                    (document_id, name, dob, id_number, address, document_type, confidence, status, extracted_fields)
+                    VALUES %s
+                    ON CONFLICT (document_id)
+                    DO UPDATE SET
+                        name = EXCLUDED.name,
+                        dob = EXCLUDED.dob,
+                        id_number = EXCLUDED.id_number,
+                        address = EXCLUDED.address,
+                        document_type = EXCLUDED.document_type,
+                        confidence = EXCLUDED.confidence,
+                        status = EXCLUDED.status,
+                        extracted_fields = EXCLUDED.extracted_fields,
+                        updated_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                    """,
+                    rows,
+                    template='(%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)',
+                    page_size=Config.BULK_INSERT_PAGE_SIZE,
+                    fetch=True
+                )
+                conn.commit()
+                
+                return [row[0] for row in results]
+                
+        except psycopg2.Error as e:
+            raise Exception(f"PostgreSQL error: {str(e)}")
+    
+    def _document_row(self, document_data: Dict[str, Any]) -> tuple:
+        """
+        Column values for an ocr_results row, in insert order
+        """
+        extracted_fields = document_data.get('extracted_fields') or {}
+        dob = extracted_fields.get('dob', None)
+        
+        # Convert date string to date object if needed
+        if isinstance(dob, str):
+            try:
+                dob = date.fromisoformat(dob)
+            except ValueError:
+                dob = None
+        
+        return (
+            document_data.get('_id', uuid7().hex),
+            extracted_fields.get('name', ''),
+            dob,
+            extracted_fields.get('id_number', ''),
+            extracted_fields.get('address', ''),
+            extracted_fields.get('document_type', ''),
+            document_data.get('confidence', 0.0),
+            document_data.get('status', 'processed'),
+            orjson.dumps(extracted_fields).decode()
+        )
+    
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve document by ID from PostgreSQL
@@ -204,11 +702,8 @@ class PostgreSQLStorage:
             return None
             
         try:
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    "SELECT * FROM ocr_results WHERE document_id = %s", 
-                    (doc_id,)
-                )
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("EXECUTE get_ocr (%s)", (doc_id,))
                 result = cur.fetchone()
                 
                 if result:
@@ -227,53 +722,75 @@ class PostgreSQLStorage:
             return False
             
         try:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE ocr_results SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE document_id = %s",
-                    (status, doc_id)
-                )
-                self.conn.commit()
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("EXECUTE upd_status (%s, %s)", (status, doc_id))
+                conn.commit()
                 return cur.rowcount > 0
                 
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"PostgreSQL error: {str(e)}")
     
-    def search_documents(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def get_and_update_status(self, doc_id: str, corrections: Dict[str, Any],
+                              status: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Search documents in PostgreSQL with filters
+        Merge field corrections into a document and optionally change its status in
+        a single UPDATE ... RETURNING, so no separate read is needed
         """
         if not self.connection_available:
-            print("PostgreSQL not available, returning empty list")
-            return []
+            print("PostgreSQL not available, returning None")
+            return None
             
         try:
-            # Build dynamic query based on filters
-            conditions = []
-            values = []
-            
-            for key, value in filters.items():
-                if key in ['name', 'id_number', 'document_type', 'status']:
-                    conditions.append(f"{key} ILIKE %s")
-                    values.append(f"%{value}%")
-                elif key == 'confidence_min':
-                    conditions.append("confidence >= %s")
-                    values.append(value)
-                elif key == 'confidence_max':
-                    conditions.append("confidence <= %s")
-                    values.append(value)
-            
-            query = "SELECT * FROM ocr_results"
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    UPDATE ocr_results SET
+                        extracted_fields = COALESCE(extracted_fields, '{}'::jsonb) || %(corrections)s::jsonb,
+                        name = COALESCE(%(corrections)s::jsonb ->> 'name', name),
+                        id_number = COALESCE(%(corrections)s::jsonb ->> 'id_number', id_number),
+                        address = COALESCE(%(corrections)s::jsonb ->> 'address', address),
+                        document_type = COALESCE(%(corrections)s::jsonb ->> 'document_type', document_type),
+                        status = COALESCE(%(status)s, status),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE document_id = %(doc_id)s
+                    RETURNING *
+                    """,
+                    {'corrections': orjson.dumps(corrections).decode(), 'status': status, 'doc_id': doc_id}
+                )
+                result = cur.fetchone()
+                conn.commit()
+                
+                if result:
+                    return dict(result)
+                return None
+                
+        except psycopg2.Error as e:
+            raise Exception(f"PostgreSQL error: {str(e)}")
+    
+    def search_documents(self, filters: Dict[str, Any], limit: Optional[int] = None,
+                         offset: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Search documents in PostgreSQL with filters. Results stream from a
+        server-side cursor as they are iterated; paging is applied by the query.
+        The pooled connection is held until iteration finishes.
+        """
+        if not self.connection_available:
+            print("PostgreSQL not available, returning no results")
+            return
             
-            query += " ORDER BY created_at DESC"
+        try:
+            # Unknown filter keys are ignored
+            keys = tuple(key for key in _SEARCH_CONDITIONS if key in filters)
+            query = _search_sql(keys)
+            values = [f"%{filters[key]}%" if key in _SUBSTRING_FILTERS else filters[key] for key in keys]
+            values += [limit, offset]
             
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # A named cursor keeps the result set on the server
+            with self._connection() as conn, conn.cursor('ocr_stream', cursor_factory=RealDictCursor) as cur:
+                cur.itersize = Config.SEARCH_BATCH_SIZE
                 cur.execute(query, values)
-                results = cur.fetchall()
-                
-                return [dict(row) for row in results]
+                for row in cur:
+                    yield dict(row)
                 
         except psycopg2.Error as e:
             raise Exception(f"PostgreSQL error: {str(e)}")
@@ -287,14 +804,10 @@ class PostgreSQLStorage:
             return
             
         try:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO ocr_processing_log (document_id, processing_step, status, error_message) VALUES (%s, %s, %s, %s)",
-                    (document_id, step, status, error_message)
-                )
-                self.conn.commit()
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("EXECUTE log_step (%s, %s, %s, %s)", (document_id, step, status, error_message))
+                conn.commit()
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"PostgreSQL error: {str(e)}")
 
 
@@ -303,11 +816,14 @@ class DataStorageManager:
     Manager class to handle both MongoDB and PostgreSQL storage
     """
     
+    # Kept only in PostgreSQL when it is available; MongoDB holds the rest of
+    # the document (OCR text, validation details, metadata)
+    POSTGRES_ONLY_FIELDS = ('extracted_fields', 'confidence')
+    
     def __init__(self):
         self.mongo_storage = MongoStorage()
+        # Tables are created when PostgreSQL is first used
         self.postgres_storage = PostgreSQLStorage()
-        if self.postgres_storage.connection_available:
-            self.postgres_storage.create_tables()
     
     def save_document(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -315,13 +831,15 @@ class DataStorageManager:
         """
         # Add a unique document ID if not present
         if '_id' not in document_data:
-            document_data['_id'] = str(uuid.uuid4())
-        
-        # Save to MongoDB (flexible storage)
-        mongo_id = self.mongo_storage.save_document(document_data.copy())
+            document_data['_id'] = uuid7().hex
         
-        # Save to PostgreSQL (structured storage)
+        # Save to PostgreSQL (structured storage) first; MongoDB (flexible storage)
+        # leaves out the fields PostgreSQL holds only once they are committed
+        # there, so a failed PostgreSQL write never leaves a partial document
         postgres_id = self.postgres_storage.save_document(document_data)
+        mongo_id = self.mongo_storage.save_document(
+            self._mongo_document(document_data, in_postgres=postgres_id != -1)
+        )
         
         return {
             'mongo_id': mongo_id,
@@ -329,6 +847,54 @@ class DataStorageManager:
             'document_id': document_data['_id']
         }
     
+    def save_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Save a batch of documents to both storages, with one bulk write per store
+        """
+        for document_data in documents:
+            if '_id' not in document_data:
+                document_data['_id'] = uuid7().hex
+        
+        # PostgreSQL first, as in save_document
+        postgres_ids = self.postgres_storage.save_documents_bulk(documents)
+        in_postgres = len(postgres_ids) == len(documents)
+        mongo_ids = self.mongo_storage.save_documents_bulk(
+            [self._mongo_document(document_data, in_postgres) for document_data in documents]
+        )
+        
+        return [
+            {
+                'mongo_id': mongo_ids[i] if i < len(mongo_ids) else None,
+                'postgres_id': postgres_ids[i] if i < len(postgres_ids) else -1,
+                'document_id': document_data['_id']
+            }
+            for i, document_data in enumerate(documents)
+        ]
+    
+    def _mongo_document(self, document_data: Dict[str, Any], in_postgres: bool) -> Dict[str, Any]:
+        """
+        The part of a document stored in MongoDB. Fields PostgreSQL has columns
+        for are left out only when the document was committed to PostgreSQL.
+        """
+        if not in_postgres:
+            return dict(document_data)
+        return {key: value for key, value in document_data.items() if key not in self.POSTGRES_ONLY_FIELDS}
+    
+    @staticmethod
+    def _combine(pg_doc: Dict[str, Any], mongo_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine a PostgreSQL row with its MongoDB document, restoring the fields
+        only PostgreSQL keeps into full_data
+        """
+        if 'extracted_fields' not in mongo_doc:
+            mongo_doc['extracted_fields'] = pg_doc.get('extracted_fields') or {}
+        if 'confidence' not in mongo_doc and pg_doc.get('confidence') is not None:
+            mongo_doc['confidence'] = float(pg_doc['confidence'])
+        
+        result = pg_doc.copy()
+        result['full_data'] = mongo_doc
+        return result
+    
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Get document from both storages
@@ -341,9 +907,7 @@ class DataStorageManager:
         
         if pg_doc and mongo_doc:
             # Combine the data
-            result = pg_doc.copy()
-            result['full_data'] = mongo_doc
-            return result
+            return self._combine(pg_doc, mongo_doc)
         elif pg_doc:
             return pg_doc
         elif mongo_doc:
@@ -357,17 +921,54 @@ class DataStorageManager:
         """
         return self.postgres_storage.update_document_status(doc_id, status)
     
-    def search_documents(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def get_and_update_status(self, doc_id: str, corrections: Dict[str, Any],
+                              status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Apply manual corrections and an optional new status in both storages,
+        returning the updated document without a separate fetch
+        """
+        pg_doc = self.postgres_storage.get_and_update_status(doc_id, corrections, status)
+        # Documents with a PostgreSQL row keep their extracted fields there, so
+        # MongoDB only gets the status for them
+        mongo_corrections = {} if pg_doc else corrections
+        mongo_doc = self.mongo_storage.get_and_update_status(doc_id, mongo_corrections, status)
+        
+        if pg_doc and mongo_doc:
+            return self._combine(pg_doc, mongo_doc)
+        return pg_doc or mongo_doc
+    
+    def get_by_hash(self, content_hash: str) -> Optional[str]:
+        """
+        Get the ID of a document already processed from identical file content
+        """
+        return self.mongo_storage.get_by_hash(content_hash)
+    
+    def flush_document(self, doc_id: str):
+        """
+        Make sure a saved document is written before it is reported as stored;
+        MongoDB saves are otherwise batched in this process
+        """
+        self.mongo_storage.flush_document(doc_id)
+    
+    def save_hash_index(self, content_hash: str, doc_id: str) -> None:
+        """
+        Remember which document was processed from a file content hash
+        """
+        self.mongo_storage.save_hash_index(content_hash, doc_id)
+    
+    def search_documents(self, query: Dict[str, Any], limit: Optional[int] = None,
+                         offset: int = 0) -> Iterator[Dict[str, Any]]:
         """
-        Search documents in PostgreSQL
+        Search documents in PostgreSQL, streaming the results
         """
-        return self.postgres_storage.search_documents(query)
+        return self.postgres_storage.search_documents(query, limit, offset)
     
     def log_processing_step(self, document_id: str, step: str, status: str, error_message: str = None):
         """
-        Log processing step
+        Log processing step. Steps go to MongoDB in unacknowledged batches rather
+        than one PostgreSQL INSERT each.
         """
-        self.postgres_storage.log_processing_step(document_id, step, status, error_message)
+        self.mongo_storage.log_processing_step(document_id, step, status, error_message)
 
 
 # Example usage
@@ -0,0 +1,106 @@
+import aiofiles
+import aiofiles.os
+import asyncio
+import orjson
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, Any, Optional
+from config.settings import Config
+
+
+class OCRResultCache:
+    """
+    Persistent OCR result cache keyed by file content hash. Entries live on disk,
+    sharded into subdirectories by the first two hex characters of the hash, so
+    they survive restarts and are shared by all workers. A small SQLite table
+    tracks access times for LRU eviction.
+    """
+
+    def __init__(self, cache_dir: str = Config.OCR_CACHE_DIR, max_entries: int = Config.OCR_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, 'index.sqlite3')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "content_hash TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps this safe across threads and workers
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _entry_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}.json")
+
+    def _touch(self, content_hash: str):
+        """
+        Record an access to a cache entry
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO cache_entries (content_hash, last_access) VALUES (?, ?) "
+                "ON CONFLICT(content_hash) DO UPDATE SET last_access = excluded.last_access",
+                (content_hash, time.time())
+            )
+            conn.commit()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries beyond max_entries
+        """
+        with closing(self._connect()) as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+            if count <= self.max_entries:
+                return
+
+            stale = [row[0] for row in conn.execute(
+                "SELECT content_hash FROM cache_entries ORDER BY last_access LIMIT ?",
+                (count - self.max_entries,)
+            )]
+            conn.executemany("DELETE FROM cache_entries WHERE content_hash = ?", [(h,) for h in stale])
+            conn.commit()
+
+        for content_hash in stale:
+            try:
+                os.unlink(self._entry_path(content_hash))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached OCR result for a content hash, or None on a miss
+        """
+        try:
+            async with aiofiles.open(self._entry_path(content_hash), 'rb') as f:
+                result = orjson.loads(await f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+        await asyncio.get_running_loop().run_in_executor(None, self._touch, content_hash)
+        return result
+
+    async def put(self, content_hash: str, ocr_result: Dict[str, Any]):
+        """
+        Store an OCR result for a content hash and evict old entries if needed
+        """
+        entry_path = self._entry_path(content_hash)
+        await aiofiles.os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a private file first so readers never see a partial entry
+        temp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(temp_path, 'wb') as f:
+            await f.write(orjson.dumps(ocr_result))
+        await aiofiles.os.replace(temp_path, entry_path)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._touch, content_hash)
+        await loop.run_in_executor(None, self._evict)
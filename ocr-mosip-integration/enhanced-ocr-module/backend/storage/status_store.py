@@ -0,0 +1,112 @@
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from config.settings import Config
+import time
+
+
+class ProcessingStatusStore:
+    """
+    Redis-backed processing status shared by all API workers
+    """
+
+    def __init__(self):
+        self.client = redis.from_url(Config.REDIS_URL, decode_responses=True)
+        self.ttl = Config.STATUS_TTL
+        # Consecutive Redis failures, and when Redis may be tried again
+        self.redis_failures = 0
+        self.redis_retry_at = 0.0
+        # Per-process fallback used only while Redis cannot be reached:
+        # doc_id -> (expiry time, status fields), oldest first
+        self.local_status: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _key(self, doc_id: str) -> str:
+        return f"ocr:status:{doc_id}"
+
+    @property
+    def redis_available(self) -> bool:
+        return time.monotonic() >= self.redis_retry_at
+
+    def _redis_failed(self, error: Exception):
+        if self.redis_failures == 0:
+            print(f"Warning: Redis connection failed: {str(error)}")
+            print("Processing status will only be visible to this worker until Redis is back")
+        self.redis_failures += 1
+        backoff = Config.REDIS_RETRY_BACKOFF * 2 ** (self.redis_failures - 1)
+        self.redis_retry_at = time.monotonic() + min(backoff, Config.REDIS_MAX_BACKOFF)
+
+    def _redis_succeeded(self):
+        if self.redis_failures:
+            print("Redis connection restored")
+        self.redis_failures = 0
+        self.redis_retry_at = 0.0
+
+    def _local_get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.local_status.get(doc_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.local_status[doc_id]
+            return None
+        return entry[1]
+
+    def _local_set(self, doc_id: str, fields: Dict[str, Any]):
+        now = time.monotonic()
+        status = self._local_get(doc_id) or {}
+        status.update(fields)
+        self.local_status[doc_id] = (now + self.ttl, status)
+        self.local_status.move_to_end(doc_id)
+        # Entries are kept in expiry order, so expired ones are at the front
+        while self.local_status:
+            oldest_id, (expires_at, _) = next(iter(self.local_status.items()))
+            if expires_at > now and len(self.local_status) <= Config.STATUS_LOCAL_MAX_ENTRIES:
+                break
+            del self.local_status[oldest_id]
+
+    async def set_status(self, doc_id: str, **fields: Any) -> None:
+        """
+        Update the status fields of a document and refresh their expiry
+        """
+        if self.redis_available:
+            # Carry over fields written locally while Redis was down
+            local = self._local_get(doc_id)
+            mapping = {**local, **fields} if local else fields
+            try:
+                key = self._key(doc_id)
+                async with self.client.pipeline(transaction=False) as pipe:
+                    pipe.hset(key, mapping=mapping)
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+            except RedisError as e:
+                self._redis_failed(e)
+            else:
+                self._redis_succeeded()
+                self.local_status.pop(doc_id, None)
+                return
+
+        self._local_set(doc_id, fields)
+
+    async def get_status(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a document, or None if it is unknown or expired
+        """
+        if self.redis_available:
+            try:
+                status = await self.client.hgetall(self._key(doc_id))
+            except RedisError as e:
+                self._redis_failed(e)
+            else:
+                self._redis_succeeded()
+                if status:
+                    if 'progress' in status:
+                        status['progress'] = int(status['progress'])
+                    return status
+
+        return self._local_get(doc_id)
+
+    async def close(self):
+        """
+        Close the Redis connection pool
+        """
+        await self.client.aclose()
@@ -1,83 +1,36 @@
 import openai
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from config.settings import Config
+from collections import OrderedDict
+from datetime import date
+import asyncio
+import hashlib
 import json
+import orjson
 import re
+import threading
 
+# Validation patterns, compiled once at import
+_PAN_RE = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]$')
+_AADHAAR_RE = re.compile(r'^\d{12}$')
+_PASSPORT_RE = re.compile(r'^[A-Z]{1}[0-9]{7}$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')  # YYYY-MM-DD format
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
+# Letters, spaces, hyphens, and apostrophes
+_NAME_RE = re.compile(r"^[A-Za-z\s\'\-]+$")
+_ID_CLEAN_RE = re.compile(r'[\s\-]+')
+_WHITESPACE_RE = re.compile(r'[\s]+')
 
-class AIVerifier:
-    """
-    AI verification layer to validate and correct OCR-extracted fields
-    """
-    
-    def __init__(self):
-        if Config.OPENAI_API_KEY:
-            openai.api_key = Config.OPENAI_API_KEY
-        self.model = Config.AI_MODEL
-    
-    def validate_and_correct(self, extracted_fields: Dict[str, Any], ocr_text: str = "") -> Dict[str, Any]:
-        """
-        Validate and correct extracted fields using AI
-        """
-        if not Config.OPENAI_API_KEY:
-            return {
-                "validated_data": extracted_fields,
-                "confidence_score": 0.0,
-                "issues_detected": ["AI verification not available - no API key configured"],
-                "corrections_made": {}
-            }
-        
-        # Create a prompt for the AI model
-        prompt = self._create_validation_prompt(extracted_fields, ocr_text)
-        
-        try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert document validation assistant. Your job is to validate extracted document fields, correct OCR errors, normalize formats, and detect inconsistencies. Respond in JSON format only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,  # Low temperature for more consistent results
-                max_tokens=1000
-            )
-            
-            response_text = response.choices[0].message['content'].strip()
-            
-            # Extract JSON from response (in case it's wrapped in markdown)
-            json_match = re.search(r'```(?:json)?\s*({.*?})\s*```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # If no markdown, assume the whole response is JSON
-                json_str = response_text
-            
-            # Parse the response
-            result = json.loads(json_str)
-            
-            return result
-            
-        except Exception as e:
-            # Fallback if AI service fails
-            return {
-                "validated_data": extracted_fields,
-                "confidence_score": 0.5,  # Default confidence when AI fails
-                "issues_detected": [f"AI verification failed: {str(e)}"],
-                "corrections_made": {},
-                "status": "ai_error"
-            }
-    
-    def _create_validation_prompt(self, extracted_fields: Dict[str, Any], ocr_text: str) -> str:
-        """
-        Create a validation prompt for the AI model
-        """
-        prompt = f"""
+# Validation prompt sent to the model, built once at import
+_PROMPT_TMPL = """
         Please validate and correct the following OCR-extracted document fields:
         
         Extracted Fields:
-        {json.dumps(extracted_fields, indent=2)}
+        {fields_json}
         
         Original OCR Text:
-        {ocr_text[:1000]}  # Limit to first 1000 characters
+        {ocr_head}
         
         Validate each field for:
         1. Format correctness (dates, ID numbers, etc.)
@@ -104,8 +57,233 @@ class AIVerifier:
         If a field is missing or invalid, return it as null in validated_data.
         Ensure the confidence_score is between 0 and 1, reflecting your confidence in the corrections.
         """
+
+# Parses the first JSON value in a string and reports where it ended
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Fixed-layout ID formats are checked by character class at known offsets; the
+# length test rejects most candidates before any character is looked at
+def _is_pan(s: str) -> bool:
+    """
+    Five uppercase letters, four digits, one uppercase letter (ABCDE1234F)
+    """
+    return (len(s) == 10 and s.isascii() and s[:5].isalpha() and s[:5].isupper()
+            and s[5:9].isdigit() and s[9].isalpha() and s[9].isupper())
+
+
+def _is_aadhaar(s: str) -> bool:
+    """
+    Twelve digits
+    """
+    return len(s) == 12 and s.isdecimal()
+
+
+def _is_passport(s: str) -> bool:
+    """
+    One uppercase letter followed by seven digits (A1234567)
+    """
+    return (len(s) == 8 and s.isascii() and s[0].isalpha() and s[0].isupper()
+            and s[1:].isdigit())
+
+
+class AIVerifier:
+    """
+    AI verification layer to validate and correct OCR-extracted fields
+    """
+    
+    SYSTEM_PROMPT = "You are an expert document validation assistant. Your job is to validate extracted document fields, correct OCR errors, normalize formats, and detect inconsistencies. Respond in JSON format only."
+    
+    def __init__(self):
+        self.model = Config.AI_MODEL
+        # Clients are created once and reused, so the HTTPS connection to the API
+        # is kept alive between documents
+        if Config.OPENAI_API_KEY:
+            self._client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+            self._async_client = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+        else:
+            self._client = None
+            self._async_client = None
+        
+        # Results keyed by a hash of the request, so reprocessing the same
+        # document does not pay for another API call
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_max_entries = Config.AI_CACHE_MAX_ENTRIES
+    
+    def validate_and_correct(self, extracted_fields: Dict[str, Any], ocr_text: str = "") -> Dict[str, Any]:
+        """
+        Validate and correct extracted fields using AI
+        """
+        skipped = self._skip_result(extracted_fields)
+        if skipped:
+            return skipped
+        
+        key = self._cache_key(extracted_fields, ocr_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self._client.chat.completions.create(**self._chat_request(extracted_fields, ocr_text))
+            result = self._parse_response(response)
+        except Exception as e:
+            return self._failure_result(extracted_fields, e)
+        
+        self._cache_put(key, result)
+        return result
+    
+    async def validate_and_correct_async(self, extracted_fields: Dict[str, Any], ocr_text: str = "") -> Dict[str, Any]:
+        """
+        Validate and correct extracted fields using AI without blocking the event loop
+        """
+        skipped = self._skip_result(extracted_fields)
+        if skipped:
+            return skipped
+        
+        key = self._cache_key(extracted_fields, ocr_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._async_client.chat.completions.create(**self._chat_request(extracted_fields, ocr_text))
+            result = self._parse_response(response)
+        except Exception as e:
+            return self._failure_result(extracted_fields, e)
+        
+        self._cache_put(key, result)
+        return result
+    
+    async def validate_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """
+        Verify several documents concurrently; items are (extracted_fields, ocr_text) pairs
+        """
+        return await asyncio.gather(*(self.validate_and_correct_async(fields, text) for fields, text in items))
+    
+    def _cache_key(self, extracted_fields: Dict[str, Any], ocr_text: str) -> bytes:
+        """
+        Hash of everything that goes into the prompt
+        """
+        payload = orjson.dumps([self.model, extracted_fields, ocr_text[:1000]], option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(payload, digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for a key, or None on a miss
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            self._cache.move_to_end(key)
+        # Entries are stored serialized so callers never share a mutable result
+        return orjson.loads(entry)
+    
+    def _cache_put(self, key: bytes, result: Dict[str, Any]):
+        """
+        Store a result, evicting the least recently used entry when full
+        """
+        entry = orjson.dumps(result)
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_max_entries:
+                self._cache.popitem(last=False)
+    
+    def _skip_result(self, extracted_fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Result to return without calling the model, or None if it should be called
+        """
+        if not Config.OPENAI_API_KEY:
+            return {
+                "validated_data": extracted_fields,
+                "confidence_score": 0.0,
+                "issues_detected": ["AI verification not available - no API key configured"],
+                "corrections_made": {}
+            }
         
-        return prompt
+        # Nothing for the model to validate or correct, so skip the round trip
+        if not any(value for key, value in extracted_fields.items() if key != 'document_type'):
+            return {
+                "validated_data": extracted_fields,
+                "confidence_score": 0.0,
+                "issues_detected": ["AI verification skipped - no fields were extracted"],
+                "corrections_made": {}
+            }
+        
+        return None
+    
+    def _chat_request(self, extracted_fields: Dict[str, Any], ocr_text: str) -> Dict[str, Any]:
+        """
+        Arguments for the chat completion call
+        """
+        # Create a prompt for the AI model
+        prompt = self._create_validation_prompt(extracted_fields, ocr_text)
+        
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,  # Low temperature for more consistent results
+            "max_tokens": 1000,
+            "response_format": {"type": "json_object"}  # JSON mode: the reply is a bare JSON object
+        }
+    
+    def _parse_response(self, response) -> Dict[str, Any]:
+        """
+        Parse the model's JSON reply
+        """
+        response_text = response.choices[0].message.content.strip()
+        
+        # JSON mode normally returns a bare object
+        try:
+            return orjson.loads(response_text)
+        except orjson.JSONDecodeError:
+            pass
+        
+        # Strip a markdown fence, if any; raw_decode stops at the end of the
+        # object, so a closing fence or trailing prose is ignored
+        if response_text.startswith('```'):
+            response_text = response_text[3:]
+            if response_text[:4].lower() == 'json':
+                response_text = response_text[4:]
+            response_text = response_text.lstrip()
+        
+        try:
+            result, _ = _JSON_DECODER.raw_decode(response_text)
+        except ValueError:
+            # Malformed reply: fall back to the first object anywhere in the text
+            start = response_text.find('{')
+            if start < 0:
+                raise
+            result, _ = _JSON_DECODER.raw_decode(response_text, start)
+        
+        return result
+    
+    def _failure_result(self, extracted_fields: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """
+        Fallback if AI service fails
+        """
+        return {
+            "validated_data": extracted_fields,
+            "confidence_score": 0.5,  # Default confidence when AI fails
+            "issues_detected": [f"AI verification failed: {str(error)}"],
+            "corrections_made": {},
+            "status": "ai_error"
+        }
+    
+    def _create_validation_prompt(self, extracted_fields: Dict[str, Any], ocr_text: str) -> str:
+        """
+        Create a validation prompt for the AI model
+        """
+        # Compact JSON: indentation only adds prompt tokens
+        return _PROMPT_TMPL.format(
+            fields_json=orjson.dumps(extracted_fields).decode(),
+            ocr_head=ocr_text[:1000]  # Limit to first 1000 characters
+        )
     
     def calculate_combined_confidence(self, ocr_confidence: float, ai_confidence: float, 
                                      validation_results: Dict[str, bool]) -> float:
@@ -130,14 +308,16 @@ class RuleBasedValidator:
     Rule-based validation layer for deterministic checks
     """
     
+    __slots__ = ('patterns',)
+    
     def __init__(self):
         self.patterns = {
-            'pan': r'^[A-Z]{5}[0-9]{4}[A-Z]$',
-            'aadhaar': r'^\d{12}$',
-            'passport': r'^[A-Z]{1}[0-9]{7}$',
-            'date': r'^\d{4}-\d{2}-\d{2}$',  # YYYY-MM-DD format
-            'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            'phone': r'^\+?[1-9]\d{1,14}$'
+            'pan': _PAN_RE,
+            'aadhaar': _AADHAAR_RE,
+            'passport': _PASSPORT_RE,
+            'date': _DATE_RE,
+            'email': _EMAIL_RE,
+            'phone': _PHONE_RE
         }
     
     def validate_fields(self, fields: Dict[str, Any]) -> Dict[str, bool]:
@@ -166,47 +346,43 @@ class RuleBasedValidator:
         
         return results
     
+    def validate_id_numbers(self, id_numbers: List[str]) -> List[bool]:
+        """
+        Validate many ID numbers in one call, e.g. when scanning a batch of
+        documents; results are in input order
+        """
+        validate = self._validate_id_number
+        return [validate(id_number) for id_number in id_numbers]
+    
     def _validate_id_number(self, id_number: str) -> bool:
         """
         Validate ID number format
         """
-        id_number_clean = re.sub(r'[\s\-]+', '', str(id_number).upper())
-        
-        # Check against PAN format
-        if re.match(self.patterns['pan'], id_number_clean):
-            return True
-        
-        # Check against Aadhaar format
-        aadhaar_clean = re.sub(r'[\s]+', '', str(id_number))
-        if re.match(self.patterns['aadhaar'], aadhaar_clean):
-            return True
+        id_number = str(id_number)
+        id_number_clean = _ID_CLEAN_RE.sub('', id_number.upper())
         
-        # Check against Passport format
-        if re.match(self.patterns['passport'], id_number_clean):
-            return True
-        
-        return False
+        # PAN, Aadhaar (only whitespace is ignored) or Passport format
+        return (_is_pan(id_number_clean)
+                or _is_aadhaar(_WHITESPACE_RE.sub('', id_number))
+                or _is_passport(id_number_clean))
     
     def _validate_date(self, date_str: str) -> bool:
         """
         Validate date format and reasonableness
         """
-        import datetime
-        
-        if not re.match(self.patterns['date'], date_str):
+        if not _DATE_RE.match(date_str):
             return False
         
         try:
-            year, month, day = map(int, date_str.split('-'))
-            date_obj = datetime.date(year, month, day)
+            date_obj = date.fromisoformat(date_str)
             
             # Check if date is not in the future
-            current_date = datetime.date.today()
+            current_date = date.today()
             if date_obj > current_date:
                 return False
             
             # Check if date is not too far in the past (before 1900)
-            if year < 1900:
+            if date_obj.year < 1900:
                 return False
             
             return True
@@ -224,7 +400,7 @@ class RuleBasedValidator:
             return False
         
         # Allow letters, spaces, hyphens, and apostrophes
-        if re.match(r"^[A-Za-z\s\'\-]+$", name_str) and len(name_str) >= 2:
+        if _NAME_RE.match(name_str) and len(name_str) >= 2:
             return True
         
         return False
@@ -239,7 +415,7 @@ class RuleBasedValidator:
         if not pattern:
             return True  # If no pattern exists, consider valid
         
-        return bool(re.match(pattern, value_str))
+        return bool(pattern.match(value_str))
 
 
 # Example usage
@@ -1,12 +1,73 @@
 """
 Script to start the OCR frontend development server
 """
+import asyncio
 import subprocess
 import sys
 import os
 import platform
+import signal
 import webbrowser
-import time
+
+FRONTEND_URL = 'http://localhost:3000'
+
+async def pump_output(stream):
+    """
+    Print lines from a subprocess stream until it closes
+    """
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        print(line.decode(errors='replace').rstrip())
+
+async def open_browser_after(delay):
+    """
+    Open the frontend in a browser once the dev server has had time to start
+    """
+    await asyncio.sleep(delay)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, webbrowser.open, FRONTEND_URL)
+        print(f"🌐 Opening browser at {FRONTEND_URL}")
+    except Exception as e:
+        print(f"⚠️ Could not automatically open browser: {e}")
+        print(f"🔗 Please manually navigate to {FRONTEND_URL}")
+
+async def run_dev_server(frontend_dir):
+    """
+    Run the Vite dev server, draining stdout and stderr concurrently, until it
+    exits or Ctrl+C stops it
+    """
+    # Own session (POSIX), so npm and the Vite server it starts can be
+    # signalled together
+    process = await asyncio.create_subprocess_exec(
+        'npm', 'run', 'dev', cwd=frontend_dir,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    
+    def stop():
+        print("\n🛑 Frontend server stopped by user")
+        try:
+            # npm leads its own process group; signal the Vite server under it too
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGINT, stop)
+    except NotImplementedError:
+        # No loop signal handlers on Windows; Ctrl+C raises KeyboardInterrupt instead
+        pass
+    
+    browser = asyncio.ensure_future(open_browser_after(3))
+    try:
+        await asyncio.gather(pump_output(process.stdout), pump_output(process.stderr))
+        return await process.wait()
+    finally:
+        browser.cancel()
+        if process.returncode is None:
+            process.terminate()
 
 def start_frontend():
     """
@@ -39,45 +100,15 @@ def start_frontend():
             print("❌ Failed to install dependencies")
             sys.exit(1)
     
-    # Command to start the frontend dev server
-    cmd = ['npm', 'run', 'dev']
-    
     try:
-        print("✅ Starting frontend server on http://localhost:3000")
+        print(f"✅ Starting frontend server on {FRONTEND_URL}")
         print("💡 Press Ctrl+C to stop the server")
         
-        # Start the subprocess
-        process = subprocess.Popen(cmd, cwd=frontend_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        # Try to open the browser after a short delay
-        def open_browser():
-            time.sleep(3)  # Wait for the server to start
-            try:
-                webbrowser.open('http://localhost:3000')
-                print("🌐 Opening browser at http://localhost:3000")
-            except Exception as e:
-                print(f"⚠️ Could not automatically open browser: {e}")
-                print("🔗 Please manually navigate to http://localhost:3000")
-        
-        # Start browser opening in a separate thread
-        import threading
-        browser_thread = threading.Thread(target=open_browser)
-        browser_thread.start()
-        
-        # Print output from the subprocess
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output.strip())
-        
-        # Wait for the process to complete
-        process.wait()
+        # Start the dev server; its output is printed as it arrives
+        asyncio.run(run_dev_server(frontend_dir))
         
     except KeyboardInterrupt:
         print("\n🛑 Frontend server stopped by user")
-        process.terminate()
     except Exception as e:
         print(f"❌ Error starting frontend: {e}")
         sys.exit(1)
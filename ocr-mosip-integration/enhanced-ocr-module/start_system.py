@@ -1,48 +1,160 @@
 """
 Script to start the complete OCR & Verification Engine system (both backend and frontend)
 """
-import subprocess
+import asyncio
 import sys
 import os
-import threading
-import time
+import platform
 import webbrowser
 import signal
-import atexit
+import urllib.error
+import urllib.request
+
+BACKEND_HEALTH_URL = 'http://localhost:8000/health'
+FRONTEND_URL = 'http://localhost:3000'
+
+def http_ok(url):
+    """
+    Whether url answers with a non-5xx HTTP status
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except OSError:
+        return False
+
+async def wait_http(url, timeout=30, process=None):
+    """
+    Poll url with exponential backoff (50ms up to 1s) until it answers. Gives up
+    after timeout seconds, or early if `process` (the server) exits.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.05
+    while loop.time() < deadline:
+        if process is not None and process.returncode is not None:
+            return False
+        if await loop.run_in_executor(None, http_ok, url):
+            return True
+        await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
+        delay = min(delay * 2, 1.0)
+    return False
+
+async def stop_process_group(process, timeout=5):
+    """
+    Stop a server together with everything it started (reloader, workers, the
+    Vite server under npm): SIGTERM to its process group, then SIGKILL if it is
+    still running after timeout seconds
+    """
+    if process.returncode is not None:
+        return
+    
+    if not hasattr(os, 'killpg'):
+        # Windows has no process groups to signal
+        process.terminate()
+        return
+    
+    # The server leads its own session, so its process group ID is its PID
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+async def pump_output(stream, prefix):
+    """
+    Print lines from a subprocess stream until it closes
+    """
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        print(f"{prefix} {line.decode(errors='replace').rstrip()}")
+
+# Paths the dev reloader ignores: runtime output written under backend/ (OCR
+# cache, temp uploads, logs) would otherwise restart the server on every request
+RELOAD_EXCLUDES = ["*.log", "*.pyc", "__pycache__/*", "temp/*", "ocr_cache/*", "*/node_modules/*"]
 
 class OCRSystemStarter:
-    def __init__(self):
+    def __init__(self, tail=False):
         self.backend_process = None
         self.frontend_process = None
         self.backend_started = False
         self.frontend_started = False
+        # Echo frontend output to the console instead of only logging it to a file
+        self.tail = tail
+        self.frontend_output = None
         
-    def start_backend(self):
+    async def start_backend(self):
         """Start the backend server"""
         print("🚀 Starting OCR Backend Server...")
         
         backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
         
-        cmd = [
-            sys.executable, "-m", "uvicorn", 
-            "api.main:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000",
-            "--reload"
-        ]
+        cmd = self._backend_command()
         
         try:
-            self.backend_process = subprocess.Popen(cmd, cwd=backend_dir)
+            # Own session (POSIX), so the server's whole process tree can be
+            # signalled together
+            self.backend_process = await asyncio.create_subprocess_exec(
+                *cmd, cwd=backend_dir, start_new_session=True
+            )
             self.backend_started = True
             print("✅ Backend server started on http://localhost:8000")
-            
-            # Wait for the process
-            self.backend_process.wait()
         except Exception as e:
             print(f"❌ Error starting backend: {e}")
             self.backend_started = False
+            raise
     
-    def start_frontend(self):
+    def _backend_command(self):
+        """Build the backend server command for the current OCR_ENV and platform"""
+        if os.getenv('OCR_ENV', 'dev') != 'prod':
+            cmd = [
+                sys.executable, "-m", "uvicorn", 
+                "api.main:app", 
+                "--host", "0.0.0.0", 
+                "--port", "8000",
+                "--reload"
+            ]
+            for pattern in RELOAD_EXCLUDES:
+                cmd += ["--reload-exclude", pattern]
+            return cmd
+        
+        if platform.system() == "Windows":
+            # Gunicorn does not run on Windows; let uvicorn manage the workers
+            workers = os.getenv('API_WORKERS', str(os.cpu_count() or 2))
+            print(f"🏭 Production mode: uvicorn with {workers} workers")
+            return [
+                sys.executable, "-m", "uvicorn", 
+                "api.main:app", 
+                "--host", "0.0.0.0", 
+                "--port", "8000",
+                "--workers", workers,
+                "--no-access-log"
+            ]
+        
+        # Tesseract and OpenCV release the GIL, so more workers than cores still pay off
+        workers = os.getenv('API_WORKERS', str(2 * (os.cpu_count() or 1) + 1))
+        print(f"🏭 Production mode: gunicorn with {workers} uvicorn workers")
+        return [
+            sys.executable, "-m", "gunicorn",
+            "api.main:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", workers,
+            "-b", "0.0.0.0:8000",
+            "--timeout", "120"  # OCR of large scans can take a while
+        ]
+    
+    async def start_frontend(self):
         """Start the frontend server"""
         print("🚀 Starting OCR Frontend Server...")
         
@@ -52,102 +164,116 @@ class OCRSystemStarter:
         node_modules_path = os.path.join(frontend_dir, 'node_modules')
         if not os.path.exists(node_modules_path):
             print("📦 Installing frontend dependencies...")
-            try:
-                subprocess.run(['npm', 'install'], cwd=frontend_dir, check=True)
-                print("✅ Dependencies installed successfully")
-            except subprocess.CalledProcessError:
+            install = await asyncio.create_subprocess_exec('npm', 'install', cwd=frontend_dir)
+            if await install.wait() != 0:
                 print("❌ Failed to install dependencies")
                 self.frontend_started = False
-                return
+                raise RuntimeError("npm install failed")
+            print("✅ Dependencies installed successfully")
         
         cmd = ['npm', 'run', 'dev']
         
         try:
-            self.frontend_process = subprocess.Popen(
-                cmd, 
-                cwd=frontend_dir, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            if self.tail:
+                self.frontend_process = await asyncio.create_subprocess_exec(
+                    *cmd, 
+                    cwd=frontend_dir, 
+                    stdout=asyncio.subprocess.PIPE, 
+                    stderr=asyncio.subprocess.STDOUT,
+                    start_new_session=True
+                )
+                self.frontend_output = asyncio.ensure_future(
+                    pump_output(self.frontend_process.stdout, "[FRONTEND]")
+                )
+            else:
+                # The server writes straight to the log file; this process keeps no
+                # copy of the descriptor once the server has started
+                log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend.log')
+                with open(log_path, 'ab', buffering=0) as log_file:
+                    self.frontend_process = await asyncio.create_subprocess_exec(
+                        *cmd, 
+                        cwd=frontend_dir, 
+                        stdout=log_file, 
+                        stderr=asyncio.subprocess.STDOUT,
+                        start_new_session=True
+                    )
+                print(f"📄 Frontend output is written to {log_path} (use --tail to show it here)")
             self.frontend_started = True
-            print("✅ Frontend server started on http://localhost:3000")
-            
-            # Print frontend output
-            while True:
-                output = self.frontend_process.stdout.readline()
-                if output == '' and self.frontend_process.poll() is not None:
-                    break
-                if output:
-                    print(f"[FRONTEND] {output.strip()}")
-            
-            self.frontend_process.wait()
+            print(f"✅ Frontend server started on {FRONTEND_URL}")
         except Exception as e:
             print(f"❌ Error starting frontend: {e}")
             self.frontend_started = False
+            raise
     
-    def start_system(self):
+    async def start_system(self):
         """Start both backend and frontend servers"""
         print("🌟 Starting Smart OCR & Verification Engine System...")
         print("="*60)
         
-        # Start backend in a separate thread
-        backend_thread = threading.Thread(target=self.start_backend)
-        backend_thread.daemon = True
-        backend_thread.start()
-        
-        # Wait a moment for backend to start
-        time.sleep(2)
-        
-        # Start frontend in a separate thread
-        frontend_thread = threading.Thread(target=self.start_frontend)
-        frontend_thread.daemon = True
-        frontend_thread.start()
+        loop = asyncio.get_running_loop()
+        try:
+            # Ctrl+C cancels this task, which stops both servers below
+            loop.add_signal_handler(signal.SIGINT, asyncio.current_task().cancel)
+        except NotImplementedError:
+            # No loop signal handlers on Windows; Ctrl+C interrupts the loop instead
+            pass
         
-        # Wait for both threads
         try:
-            # Wait for a moment to ensure both are running
-            time.sleep(5)
+            # Both servers boot at once; startup takes as long as the slower one
+            await asyncio.gather(self.start_backend(), self.start_frontend())
+            backend_ready, frontend_ready = await asyncio.gather(
+                wait_http(BACKEND_HEALTH_URL, process=self.backend_process),
+                wait_http(FRONTEND_URL, process=self.frontend_process)
+            )
+            if not backend_ready:
+                print("⚠️ Backend is not answering its health check yet")
             
             print("\n" + "="*60)
             print("🎉 Smart OCR & Verification Engine is running!")
             print("🔧 Backend: http://localhost:8000")
-            print("🎨 Frontend: http://localhost:3000")
-            print("📊 Health Check: http://localhost:8000/health")
+            print(f"🎨 Frontend: {FRONTEND_URL}")
+            print(f"📊 Health Check: {BACKEND_HEALTH_URL}")
             print("\n💡 Press Ctrl+C to stop the system")
             print("="*60)
             
             # Try to open browser
-            try:
-                time.sleep(3)  # Wait a bit more for servers to fully start
-                webbrowser.open('http://localhost:3000')
-                print("🌐 Opening browser automatically...")
-            except Exception as e:
-                print(f"⚠️ Could not open browser automatically: {e}")
-                print("🔗 Please manually navigate to http://localhost:3000")
+            if frontend_ready:
+                try:
+                    await loop.run_in_executor(None, webbrowser.open, FRONTEND_URL)
+                    print("🌐 Opening browser automatically...")
+                except Exception as e:
+                    print(f"⚠️ Could not open browser automatically: {e}")
+                    print(f"🔗 Please manually navigate to {FRONTEND_URL}")
+            else:
+                print(f"🔗 Please navigate to {FRONTEND_URL} once the frontend is up")
             
-            # Wait for threads to complete
-            backend_thread.join()
-            frontend_thread.join()
+            # Run until both servers exit
+            waiters = [self.backend_process.wait(), self.frontend_process.wait()]
+            if self.frontend_output:
+                waiters.append(self.frontend_output)
+            await asyncio.gather(*waiters)
             
-        except KeyboardInterrupt:
+        except asyncio.CancelledError:
             print("\n🛑 Shutting down OCR & Verification Engine...")
-            self.stop_system()
+        except Exception as e:
+            print(f"❌ System stopped after an error: {e}")
+        finally:
+            await self.stop_system()
     
-    def stop_system(self):
+    async def stop_system(self):
         """Stop both servers"""
         print("🛑 Stopping system...")
         
         if self.backend_process:
             try:
-                self.backend_process.terminate()
+                await stop_process_group(self.backend_process)
                 print("✅ Backend server stopped")
             except:
                 pass
         
         if self.frontend_process:
             try:
-                self.frontend_process.terminate()
+                await stop_process_group(self.frontend_process)
                 print("✅ Frontend server stopped")
             except:
                 pass
@@ -155,18 +281,13 @@ class OCRSystemStarter:
         print("👋 OCR & Verification Engine stopped safely")
 
 def main():
-    starter = OCRSystemStarter()
-    
-    # Register cleanup function
-    def cleanup():
-        starter.stop_system()
-    
-    atexit.register(cleanup)
+    starter = OCRSystemStarter(tail='--tail' in sys.argv[1:])
     
     try:
-        starter.start_system()
+        # Servers are stopped by start_system itself, including on Ctrl+C
+        asyncio.run(starter.start_system())
     except KeyboardInterrupt:
-        starter.stop_system()
+        pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,39 @@
+import os
+import unittest
+from unittest.mock import patch, AsyncMock
+import backend.main
+from backend.main import process_batch
+
+
+class _StubEngine:
+    """
+    Light engine for the worker processes; importable by name, so it pickles
+    """
+    
+    async def process_document_async(self, file_path):
+        return {"document_id": file_path, "pid": os.getpid()}
+
+
+class TestBatchOCR(unittest.TestCase):
+    @patch.object(backend.main, 'AIOMULTIPROCESS_AVAILABLE', False)
+    @patch.object(backend.main, 'SmartOCREngine')
+    def test_process_batch_in_process(self, mock_engine_class):
+        # Without aiomultiprocess the documents share one engine in this process
+        engine = mock_engine_class.return_value
+        engine.process_document_async = AsyncMock(side_effect=lambda path: {"document_id": path})
+        
+        paths = ["first.jpg", "second.jpg", "third.jpg"]
+        results = process_batch(paths)
+        
+        # Results come back in input order, one engine for the whole batch
+        self.assertEqual([result["document_id"] for result in results], paths)
+        mock_engine_class.assert_called_once()
+    
+    @unittest.skipUnless(backend.main.AIOMULTIPROCESS_AVAILABLE, "aiomultiprocess not installed")
+    def test_process_batch_worker_pool(self):
+        paths = [f"page_{i}.jpg" for i in range(6)]
+        results = process_batch(paths, processes=2, engine_class=_StubEngine)
+        
+        # Results come back in input order, processed in the worker processes
+        self.assertEqual([result["document_id"] for result in results], paths)
+        self.assertNotIn(os.getpid(), {result["pid"] for result in results})
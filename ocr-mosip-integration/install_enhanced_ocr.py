@@ -5,20 +5,22 @@ Installs PaddleOCR, EasyOCR, TrOCR, and configures Tesseract
 Replaces Google Vision and AWS Textract with offline alternatives
 """
 
+import functools
+import shutil
 import subprocess
 import sys
 import os
 import platform
-import requests
+import sysconfig
 from pathlib import Path
 
-def run_command(command, description=""):
-    """Run a command and handle errors"""
+def run_command(argv, description=""):
+    """Run a command given as an argument list, without a shell, and handle errors"""
     print(f"🔧 {description}")
-    print(f"   Command: {command}")
+    print(f"   Command: {' '.join(argv)}")
     
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(argv, check=True, capture_output=True, text=True)
         print(f"   ✅ Success")
         if result.stdout:
             print(f"   Output: {result.stdout.strip()}")
@@ -30,6 +32,10 @@ def run_command(command, description=""):
         if e.stderr:
             print(f"   Stderr: {e.stderr}")
         return False
+    except FileNotFoundError:
+        # Without a shell, a missing program raises instead of exiting with 127
+        print(f"   ❌ Command not found: {argv[0]}")
+        return False
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -43,70 +49,89 @@ def check_python_version():
     print("✅ Python version is compatible")
     return True
 
-def install_paddle_ocr():
-    """Install PaddleOCR"""
-    print("\n📦 Installing PaddleOCR...")
-    
+def has_cuda():
+    """Check for an NVIDIA driver without importing torch, which is slow and may not be installed yet"""
+    return shutil.which('nvidia-smi') is not None or os.path.exists('/proc/driver/nvidia/version')
+
+def plan_python_packages():
+    """Return the pip requirements for all OCR engines and their dependencies"""
     # Check if CUDA is available
-    try:
-        import torch
-        cuda_available = torch.cuda.is_available()
-        print(f"   CUDA available: {cuda_available}")
-    except ImportError:
-        cuda_available = False
-        print("   CUDA check skipped (torch not installed yet)")
-    
-    # Install PaddlePaddle
+    cuda_available = has_cuda()
+    print(f"   CUDA available: {cuda_available}")
+    
     if cuda_available:
-        paddle_cmd = "pip install paddlepaddle-gpu"
-        print("   Installing PaddlePaddle with GPU support...")
+        print("   Using PaddlePaddle with GPU support")
     else:
-        paddle_cmd = "pip install paddlepaddle"
-        print("   Installing PaddlePaddle (CPU version)...")
-    
-    if not run_command(paddle_cmd, "Installing PaddlePaddle"):
-        return False
+        print("   Using PaddlePaddle (CPU version)")
+    
+    packages = [
+        # Image processing and serving
+        "opencv-python",
+        "Pillow",
+        "numpy",
+        "uvicorn[standard]",  # uvloop and httptools
+        # PaddleOCR
+        "paddlepaddle-gpu" if cuda_available else "paddlepaddle",
+        "paddleocr",
+        # EasyOCR
+        "easyocr",
+        # TrOCR (Transformers + PyTorch)
+        "torch",
+        "torchvision",
+        "transformers",
+        # Tesseract bindings
+        "pytesseract",
+    ]
     
-    # Install PaddleOCR
-    if not run_command("pip install paddleocr", "Installing PaddleOCR"):
-        return False
+    # Process manager for production; it does not run on Windows
+    if platform.system().lower() != "windows":
+        packages.append("gunicorn")
     
-    return True
+    return packages
 
-def install_easy_ocr():
-    """Install EasyOCR"""
-    print("\n📦 Installing EasyOCR...")
-    return run_command("pip install easyocr", "Installing EasyOCR")
+def install_python_packages(packages, wheelhouse):
+    """
+    Install all Python packages with a single pip run from a local wheel cache.
+    Returns (success, cached_files, total_files) for the cache report.
+    """
+    print("\n📦 Installing Python packages...")
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    before = set(os.listdir(wheelhouse))
+    
+    # Fetch only what the cache is missing; files already there are not downloaded again
+    downloaded = run_command(
+        [sys.executable, "-m", "pip", "download", "--prefer-binary",
+         "--dest", str(wheelhouse), "--find-links", str(wheelhouse), *packages],
+        f"Downloading missing packages to {wheelhouse}"
+    )
+    if not downloaded:
+        print("   ⚠️  Download failed, trying to install from the cache alone")
+    
+    after = set(os.listdir(wheelhouse))
+    cached = len(before & after)
+    
+    # One resolver run for everything, without touching the network
+    success = run_command(
+        [sys.executable, "-m", "pip", "install", "--no-index",
+         "--find-links", str(wheelhouse), *packages],
+        f"Installing {len(packages)} packages from the cache"
+    )
+    return success, cached, len(after)
 
-def install_trocr():
-    """Install TrOCR (Transformers + PyTorch)"""
-    print("\n📦 Installing TrOCR...")
-    
-    # Install PyTorch
-    if not run_command("pip install torch torchvision", "Installing PyTorch"):
-        return False
-    
-    # Install Transformers
-    if not run_command("pip install transformers", "Installing Transformers"):
-        return False
-    
-    return True
+# Common Tesseract install locations on Windows, probed when it is not on PATH
+WINDOWS_TESSERACT_PATHS = [
+    r"D:\Tesseract\tesseract.exe",
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+    r"C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', 'User'))
+]
 
-def install_image_processing():
-    """Install image processing libraries"""
-    print("\n📦 Installing image processing libraries...")
-    
-    libraries = [
-        ("opencv-python", "OpenCV"),
-        ("Pillow", "PIL/Pillow"),
-        ("numpy", "NumPy")
-    ]
-    
-    for lib, name in libraries:
-        if not run_command(f"pip install {lib}", f"Installing {name}"):
-            return False
-    
-    return True
+@functools.lru_cache(maxsize=1)
+def find_tesseract():
+    """Return the path to the Tesseract executable, or None if it can't be found"""
+    # One PATH scan first, then the usual install locations
+    return shutil.which("tesseract") or next(
+        (path for path in WINDOWS_TESSERACT_PATHS if Path(path).exists()), None
+    )
 
 def configure_tesseract():
     """Configure Tesseract OCR"""
@@ -115,40 +140,25 @@ def configure_tesseract():
     system = platform.system().lower()
     
     if system == "windows":
-        # Check common Tesseract installation paths
-        tesseract_paths = [
-            r"D:\Tesseract\tesseract.exe",
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', 'User'))
-        ]
-        
-        tesseract_found = False
-        for path in tesseract_paths:
-            if os.path.exists(path):
-                print(f"   ✅ Tesseract found at: {path}")
-                tesseract_found = True
-                break
-        
-        if not tesseract_found:
+        tesseract_path = find_tesseract()
+        if tesseract_path:
+            print(f"   ✅ Tesseract found at: {tesseract_path}")
+        else:
             print("   ⚠️  Tesseract not found in common locations")
             print("   📥 Download Tesseract from: https://github.com/UB-Mannheim/tesseract/wiki")
             print("   💡 Recommended installation path: D:\\Tesseract\\")
             return False
     
     elif system == "linux":
-        if not run_command("sudo apt-get update", "Updating package list"):
+        if not run_command(["sudo", "apt-get", "update"], "Updating package list"):
             return False
-        if not run_command("sudo apt-get install -y tesseract-ocr tesseract-ocr-hin", "Installing Tesseract"):
+        if not run_command(["sudo", "apt-get", "install", "-y", "tesseract-ocr", "tesseract-ocr-hin"], "Installing Tesseract"):
             return False
     
     elif system == "darwin":  # macOS
-        if not run_command("brew install tesseract tesseract-lang", "Installing Tesseract via Homebrew"):
+        if not run_command(["brew", "install", "tesseract", "tesseract-lang"], "Installing Tesseract via Homebrew"):
             return False
     
-    # Install pytesseract
-    if not run_command("pip install pytesseract", "Installing pytesseract"):
-        return False
-    
     return True
 
 def test_installations():
@@ -206,6 +216,34 @@ def test_installations():
     
     return successful == total
 
+# Import packages whose bytecode is compiled ahead of time, so the first OCR
+# request does not pay for it
+PRECOMPILE_PACKAGES = [
+    "paddleocr", "paddle", "easyocr", "transformers", "torch", "torchvision",
+    "cv2", "PIL", "numpy", "pytesseract"
+]
+
+def precompile_packages():
+    """Compile the installed OCR packages to bytecode in parallel"""
+    print("\n⚙️  Precompiling OCR packages...")
+    
+    site_dirs = {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]}
+    package_dirs = sorted(
+        str(Path(site_dir) / package)
+        for site_dir in site_dirs
+        for package in PRECOMPILE_PACKAGES
+        if (Path(site_dir) / package).is_dir()
+    )
+    if not package_dirs:
+        print("   ⚠️  No installed packages to precompile")
+        return False
+    
+    # -j 0 uses every core
+    return run_command(
+        [sys.executable, "-m", "compileall", "-q", "-j", "0", *package_dirs],
+        f"Compiling {len(package_dirs)} packages"
+    )
+
 def create_test_script():
     """Create a test script for the enhanced OCR"""
     print("\n📝 Creating test script...")
@@ -276,22 +314,13 @@ def main():
     # Install components
     success = True
     
-    # Install image processing libraries first
-    if not install_image_processing():
-        print("❌ Failed to install image processing libraries")
-        success = False
-    
-    # Install OCR engines
-    if not install_paddle_ocr():
-        print("❌ Failed to install PaddleOCR")
-        success = False
-    
-    if not install_easy_ocr():
-        print("❌ Failed to install EasyOCR")
-        success = False
-    
-    if not install_trocr():
-        print("❌ Failed to install TrOCR")
+    # Install the OCR engines and image processing libraries
+    print("\n📋 Planning Python packages...")
+    packages = plan_python_packages()
+    wheelhouse = Path(os.getenv("OCR_WHEELHOUSE", Path.home() / ".cache" / "ocr_wheels"))
+    installed, cached_files, total_files = install_python_packages(packages, wheelhouse)
+    if not installed:
+        print("❌ Failed to install Python packages")
         success = False
     
     if not configure_tesseract():
@@ -302,11 +331,19 @@ def main():
     if success:
         success = test_installations()
     
+    # Compile bytecode now rather than on the first request; a failure here
+    # only costs startup time
+    if success and not precompile_packages():
+        print("⚠️ Some packages could not be precompiled; they will compile on first import")
+    
     # Create test script
     create_test_script()
     
     # Final summary
     print("\n" + "=" * 50)
+    if total_files:
+        print(f"📦 Wheel cache: {cached_files}/{total_files} files reused from {wheelhouse} "
+              f"({100 * cached_files // total_files}%)")
     if success:
         print("🎉 Enhanced OCR installation completed successfully!")
         print("\n📋 Next steps:")
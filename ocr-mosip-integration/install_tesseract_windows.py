@@ -4,30 +4,112 @@ Install Tesseract OCR on Windows with Hindi Language Support
 Downloads and installs Tesseract OCR automatically
 """
 
+import functools
 import os
-import requests
+import shutil
 import subprocess
 import sys
+import tempfile
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def download_file(url, filename):
-    """Download file with progress"""
-    print(f"📥 Downloading {filename}...")
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB per read and per progress update
+DOWNLOAD_BUFFER_SIZE = 8 << 20  # 8 MiB write buffer
+# Downloaded installers are kept here so later runs can reuse them
+INSTALLER_CACHE_DIR = os.getenv('OCR_INSTALLER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ocr_installers'))
+
+class ProgressWriter:
+    """File wrapper that counts written bytes and prints progress once per chunk"""
+    
+    def __init__(self, file, total_size, downloaded=0):
+        self.file = file
+        self.total_size = total_size
+        self.downloaded = downloaded
+        self.last_print = downloaded
+    
+    def write(self, data):
+        written = self.file.write(data)
+        self.downloaded += len(data)
+        if self.total_size > 0 and (self.downloaded - self.last_print >= DOWNLOAD_CHUNK_SIZE
+                                    or self.downloaded == self.total_size):
+            self.last_print = self.downloaded
+            percent = (self.downloaded / self.total_size) * 100
+            print(f"\r📊 Progress: {percent:.1f}%", end='', flush=True)
+        return written
+
+def download_file(url, filename, offset=0):
+    """Download file with progress, resuming a partial file from byte `offset`"""
+    print(f"📥 Downloading {os.path.basename(filename)}...")
+    
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header('Range', f'bytes={offset}-')
+    
+    with urllib.request.urlopen(request) as response:
+        if offset and response.status != 206:
+            # The server ignored the range and is sending the whole file
+            offset = 0
+        total_size = offset + response.length if response.length else 0
+        
+        with open(filename, 'ab' if offset else 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as file:
+            writer = ProgressWriter(file, total_size, offset)
+            shutil.copyfileobj(response, writer, length=DOWNLOAD_CHUNK_SIZE)
+    
+    print(f"\n✅ Downloaded: {os.path.basename(filename)}")
+
+def remote_file_info(url):
+    """Size, ETag and range support of a download, from a HEAD request"""
+    request = urllib.request.Request(url, method='HEAD')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return (int(response.headers.get('Content-Length', 0)),
+                    response.headers.get('ETag'),
+                    response.headers.get('Accept-Ranges') == 'bytes')
+    except (urllib.error.URLError, ValueError):
+        # Some servers reject HEAD; the download itself will tell
+        return 0, None, False
+
+def read_text(path):
+    """Contents of a small text file, or None if it can't be read"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def fetch_file(url, filename):
+    """
+    Download url to filename unless the copy already there matches the server's
+    size and ETag. An interrupted download is kept as filename.part and resumed
+    with a Range request if the file on the server has not changed.
+    """
+    size, etag, accepts_ranges = remote_file_info(url)
+    etag_path = filename + '.etag'
+    part_path = filename + '.part'
     
-    response = requests.get(url, stream=True)
-    total_size = int(response.headers.get('content-length', 0))
+    if (etag and os.path.exists(filename) and os.path.getsize(filename) == size
+            and read_text(etag_path) == etag):
+        print(f"✅ Using cached {os.path.basename(filename)}")
+        return
     
-    with open(filename, 'wb') as file:
-        downloaded = 0
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                file.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0:
-                    percent = (downloaded / total_size) * 100
-                    print(f"\r📊 Progress: {percent:.1f}%", end='', flush=True)
+    offset = 0
+    if etag and accepts_ranges and os.path.exists(part_path) and read_text(etag_path) == etag:
+        offset = os.path.getsize(part_path)
+        if offset >= size:
+            offset = 0
+    else:
+        # Fresh download: forget the old file and record which version is coming
+        for stale_path in (filename, etag_path):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        if etag:
+            with open(etag_path, 'w', encoding='utf-8') as f:
+                f.write(etag)
     
-    print(f"\n✅ Downloaded: {filename}")
+    download_file(url, part_path, offset)
+    os.replace(part_path, filename)
 
 def install_tesseract_windows():
     """Install Tesseract OCR on Windows"""
@@ -36,11 +118,12 @@ def install_tesseract_windows():
     
     # Tesseract installer URL (latest version)
     tesseract_url = "https://github.com/UB-Mannheim/tesseract/releases/download/v5.3.3.20231005/tesseract-ocr-w64-setup-5.3.3.20231005.exe"
-    installer_name = "tesseract-installer.exe"
+    installer_name = os.path.join(INSTALLER_CACHE_DIR, "tesseract-installer.exe")
     
     try:
-        # Download Tesseract installer
-        download_file(tesseract_url, installer_name)
+        # Download Tesseract installer, unless the cached one is current
+        os.makedirs(INSTALLER_CACHE_DIR, exist_ok=True)
+        fetch_file(tesseract_url, installer_name)
         
         print("\n🚀 Running Tesseract installer...")
         print("⚠️  Please follow the installer prompts:")
@@ -53,10 +136,7 @@ def install_tesseract_windows():
         subprocess.run([installer_name], check=True)
         
         print("✅ Tesseract installation completed!")
-        
-        # Clean up
-        os.remove(installer_name)
-        print("🧹 Cleaned up installer file")
+        print(f"💾 Installer kept in {INSTALLER_CACHE_DIR} for future runs")
         
         return True
         
@@ -75,13 +155,79 @@ def install_python_dependencies():
         'opencv-python'
     ]
     
-    for package in packages:
-        try:
-            print(f"Installing {package}...")
-            subprocess.run([sys.executable, '-m', 'pip', 'install', package], check=True)
-            print(f"✅ {package} installed")
-        except subprocess.CalledProcessError:
-            print(f"❌ Failed to install {package}")
+    # One pip run resolves and installs everything together, preferring wheels,
+    # without pip's self-update check
+    pip_options = ['--disable-pip-version-check', '--no-input', '--prefer-binary']
+    pip_install = [sys.executable, '-m', 'pip', 'install'] + pip_options
+    
+    print(f"Installing {', '.join(packages)}...")
+    if subprocess.run(pip_install + packages).returncode == 0:
+        print("✅ All packages installed")
+        return
+    
+    print("⚠️  Batch install failed, checking packages one by one...")
+    install_packages_individually(packages, pip_options)
+
+def download_package(package, wheelhouse, pip_options):
+    """Download a package and its dependencies into wheelhouse"""
+    return subprocess.run(
+        [sys.executable, '-m', 'pip', 'download', '-d', wheelhouse] + pip_options + [package],
+        capture_output=True
+    ).returncode == 0
+
+def install_packages_individually(packages, pip_options):
+    """Find out which packages fail, downloading them concurrently"""
+    # Downloads are network-bound and overlap well; installs run one at a time,
+    # as parallel installs into one environment can clash over shared
+    # dependencies such as numpy
+    with tempfile.TemporaryDirectory() as wheelhouse:
+        with ThreadPoolExecutor(max_workers=min(len(packages), 4)) as pool:
+            downloaded = list(pool.map(lambda package: download_package(package, wheelhouse, pip_options), packages))
+        
+        install = [sys.executable, '-m', 'pip', 'install', '--no-index', '--find-links', wheelhouse] + pip_options
+        for package, ok in zip(packages, downloaded):
+            if not ok:
+                print(f"❌ Failed to download {package}")
+            elif subprocess.run(install + [package]).returncode == 0:
+                print(f"✅ {package} installed")
+            else:
+                print(f"❌ Failed to install {package}")
+
+# Common Windows paths for Tesseract
+WINDOWS_TESSERACT_PATHS = [
+    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
+]
+# Remembers where Tesseract was found, so later runs go straight to it
+TESSERACT_PATH_FILE = '.tesseract_path'
+
+@functools.lru_cache(maxsize=1)
+def find_tesseract():
+    """Return the path to the Tesseract executable, or None if it can't be found"""
+    try:
+        with open(TESSERACT_PATH_FILE, encoding='utf-8') as f:
+            saved_path = f.read().strip()
+        if saved_path and os.path.exists(saved_path):
+            return saved_path
+    except OSError:
+        pass
+    
+    for path in WINDOWS_TESSERACT_PATHS:
+        if os.path.exists(path):
+            try:
+                with open(TESSERACT_PATH_FILE, 'w', encoding='utf-8') as f:
+                    f.write(path)
+            except OSError:
+                pass
+            return path
+    return None
+
+@functools.lru_cache(maxsize=1)
+def tesseract_languages(tesseract_cmd):
+    """Languages installed for a Tesseract executable; runs `tesseract --list-langs` once"""
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    return tuple(pytesseract.get_languages())
 
 def verify_installation():
     """Verify Tesseract installation"""
@@ -92,27 +238,17 @@ def verify_installation():
         import pytesseract
         from PIL import Image
         
-        # Common Windows paths for Tesseract
-        tesseract_paths = [
-            r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-            r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
-        ]
-        
-        tesseract_found = False
-        for path in tesseract_paths:
-            if os.path.exists(path):
-                pytesseract.pytesseract.tesseract_cmd = path
-                tesseract_found = True
-                print(f"✅ Tesseract found at: {path}")
-                break
-        
-        if not tesseract_found:
+        tesseract_path = find_tesseract()
+        if not tesseract_path:
             print("⚠️  Tesseract not found in common locations")
             return False
         
+        print(f"✅ Tesseract found at: {tesseract_path}")
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        
         # Check available languages
         try:
-            languages = pytesseract.get_languages()
+            languages = tesseract_languages(tesseract_path)
             print(f"📋 Available languages: {', '.join(languages)}")
             
             if 'hin' in languages:
@@ -1,7 +1,9 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
+import functools
 from dotenv import load_dotenv
 import logging
 import base64
@@ -18,9 +20,38 @@ from injinet_client import InjInetClient, MockInjINetClient
 from inji_verify_client import InjiVerifyClient, MockInjiVerifyClient
 from semantic_validator import SemanticValidator
 
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 load_dotenv()
 
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes responses with orjson, falling back to Flask's
+    encoder for values orjson does not handle
+    """
+    
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 # Enable CORS for Stoplight Studio integration
 CORS(app, origins=["*"])  # Allow all origins for development
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size (increased for multi-page documents)
@@ -355,12 +386,13 @@ def get_api_docs_yaml():
     except Exception as e:
         return f'# Error loading API specification: {str(e)}', 500, {'Content-Type': 'text/plain'}
 
-@app.route('/', methods=['GET'])
-def api_info():
+@functools.lru_cache(maxsize=32)
+def _api_info_body(host_url):
     """
-    API information and documentation links
+    Serialized API information; only the host in the spec link differs between
+    requests, so each host's body is built once
     """
-    return jsonify({
+    return app.json.dumps({
         'service': 'OCR-MOSIP Integration API',
         'version': '1.0',
         'description': 'OCR-driven solution for text extraction and data verification',
@@ -372,20 +404,27 @@ def api_info():
             'api_docs_yaml': '/api/docs/yaml'
         },
         'documentation': {
-            'openapi_spec': f'{request.host_url}api/docs',
+            'openapi_spec': f'{host_url}api/docs',
             'stoplight_ready': True
         },
         'status': 'ready'
-    }), 200
+    }).encode()
+
+@app.route('/', methods=['GET'])
+def api_info():
+    """
+    API information and documentation links
+    """
+    return app.response_class(_api_info_body(request.host_url), mimetype='application/json')
+
+# Health payload with only the timestamp left to fill in; isoformat() output never needs JSON escaping
+_HEALTH_TEMPLATE = b'{"status":"healthy","service":"OCR-MOSIP Integration Service","timestamp":"%s"}'
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'OCR-MOSIP Integration Service',
-        'timestamp': datetime.now().isoformat()
-    }), 200
+    body = _HEALTH_TEMPLATE % datetime.now().isoformat().encode()
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/ocr/extract', methods=['POST'])
 def extract_text():
@@ -4194,8 +4233,17 @@ def combine_document_extractions():
         }), 500
 
 if __name__ == '__main__':
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=os.getenv('FLASK_DEBUG', False)
-    )
+    import sys
+    
+    # Waitress serves requests from a thread pool; --dev keeps Flask's reloading dev server.
+    # On Linux, gunicorn works too: gunicorn -w $(nproc) -k gthread --threads 4 app:app
+    if '--dev' in sys.argv[1:] or not WAITRESS_AVAILABLE:
+        if not WAITRESS_AVAILABLE:
+            logger.warning("waitress not installed, falling back to the Flask development server")
+        app.run(
+            host='0.0.0.0',
+            port=5000,
+            debug=os.getenv('FLASK_DEBUG', 'false').lower() in ('1', 'true')
+        )
+    else:
+        serve(app, host='0.0.0.0', port=5000, threads=int(os.getenv('WAITRESS_THREADS', '8')))